@@ -4,17 +4,34 @@ from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from flask import Flask, jsonify, render_template, request
-
-DB_CONFIG: Dict[str, Any] = {
-    "dbname": "nexo_precios",
-    "user": "TU_USUARIO_AQUI",
-    "password": "TU_PASSWORD_AQUI",
-    "host": "localhost",
-    "port": 5432,
-}
+from flask import Flask, Response, jsonify, render_template, request
+
+from consultas import (
+    DB_CONFIG,
+    PRICE_ROW_COLUMNS,
+    STORE_MAP_VERSION_QUERY,
+    SUCURSAL_COLUMNS,
+    TILE_HTTP_MAX_AGE,
+    canasta_query,
+    price_rows_query,
+    price_summary_query,
+    read_bbox_args,
+    read_canasta_args,
+    read_filters,
+    read_format,
+    store_tile_query,
+    stores_geojson_query,
+    sucursales_query,
+    valid_tile,
+)
+from serializacion import FastJSONProvider
+from src.json_codec import to_columns
+from tile_cache import TileCache, tile_etag
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+tile_cache = TileCache()
 
 
 def get_connection() -> Optional[psycopg2.extensions.connection]:
@@ -55,93 +72,21 @@ def run_query(
         connection.close()
 
 
-FILTER_FIELDS = {
-    "producto": "pr.nombre",
-    "barrio": "b.nombre_barrio",
-    "comercio": "c.nombre_comercio",
-}
-
-
-def build_filter_clause(args: Dict[str, str]) -> Tuple[str, List[object]]:
-    conditions: List[str] = []
-    params: List[object] = []
-
-    for field, column in FILTER_FIELDS.items():
-        value = args.get(field, "").strip()
-        if value:
-            conditions.append(f"{column} ILIKE %s")
-            params.append(f"%{value}%")
-
-    fecha_desde = args.get("fecha_desde", "").strip()
-    if fecha_desde:
-        conditions.append("p.fecha_captura >= %s")
-        params.append(fecha_desde)
-
-    fecha_hasta = args.get("fecha_hasta", "").strip()
-    if fecha_hasta:
-        conditions.append("p.fecha_captura <= %s")
-        params.append(fecha_hasta)
-
-    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-    return where_clause, params
-
-
 def fetch_price_rows(filters: Dict[str, str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
-    where_clause, params = build_filter_clause(filters)
-    query = f"
-        SELECT
-            p.id_precio,
-            pr.nombre AS producto,
-            pr.marca,
-            s.nombre_sucursal,
-            b.nombre_barrio,
-            c.nombre_comercio,
-            f.nombre_fuente,
-            p.precio_lista,
-            p.fecha_captura
-        FROM precio AS p
-        JOIN producto AS pr ON p.id_producto = pr.id_producto
-        JOIN sucursal AS s ON p.id_sucursal = s.id_sucursal
-        JOIN barrio AS b ON s.id_barrio = b.id_barrio
-        JOIN comercio AS c ON s.id_comercio = c.id_comercio
-        JOIN fuente_datos AS f ON p.id_fuente = f.id_fuente
-        {where_clause}
-        ORDER BY p.fecha_captura DESC, p.id_precio DESC;
-    ""
-
+    query, params = price_rows_query(filters)
     rows, error = run_query(query, params)
     return rows or [], error
 
 
 def fetch_price_summary(filters: Dict[str, str]) -> Tuple[Dict[str, Any], Optional[str]]:
-    where_clause, params = build_filter_clause(filters)
-    query = f"
-        SELECT
-            MIN(p.precio_lista) AS precio_minimo,
-            MAX(p.precio_lista) AS precio_maximo,
-            AVG(p.precio_lista) AS precio_promedio,
-            COUNT(*) AS total_precios
-        FROM precio AS p
-        JOIN producto AS pr ON p.id_producto = pr.id_producto
-        JOIN sucursal AS s ON p.id_sucursal = s.id_sucursal
-        JOIN barrio AS b ON s.id_barrio = b.id_barrio
-        JOIN comercio AS c ON s.id_comercio = c.id_comercio
-        {where_clause};
-    ""
-
+    query, params = price_summary_query(filters)
     summary, error = run_query(query, params, fetch="one")
     return summary or {}, error
 
 
 @app.route("/")
 def index() -> str:
-    filters = {
-        "producto": request.args.get("producto", ""),
-        "barrio": request.args.get("barrio", ""),
-        "comercio": request.args.get("comercio", ""),
-        "fecha_desde": request.args.get("fecha_desde", ""),
-        "fecha_hasta": request.args.get("fecha_hasta", ""),
-    }
+    filters = read_filters(request.args)
 
     precios, price_error = fetch_price_rows(filters)
     resumen, summary_error = fetch_price_summary(filters)
@@ -158,54 +103,25 @@ def index() -> str:
 
 @app.route("/api/sucursales")
 def api_sucursales() -> Any:
-    filters = {
-        "producto": request.args.get("producto", ""),
-        "barrio": request.args.get("barrio", ""),
-        "comercio": request.args.get("comercio", ""),
-        "fecha_desde": request.args.get("fecha_desde", ""),
-        "fecha_hasta": request.args.get("fecha_hasta", ""),
-    }
-
-    where_clause, params = build_filter_clause(filters)
-
-    precio_minimo_expr = "MIN(p.precio_lista) AS precio_minimo" if filters.get("producto") else "NULL AS precio_minimo"
-
-    query = f"
-        SELECT
-            s.id_sucursal,
-            s.nombre_sucursal,
-            b.nombre_barrio,
-            c.nombre_comercio,
-            COUNT(p.id_precio) AS total_precios,
-            MAX(p.fecha_captura) AS ultima_captura,
-            {precio_minimo_expr}
-        FROM sucursal AS s
-        JOIN barrio AS b ON s.id_barrio = b.id_barrio
-        JOIN comercio AS c ON s.id_comercio = c.id_comercio
-        JOIN precio AS p ON p.id_sucursal = s.id_sucursal
-        JOIN producto AS pr ON p.id_producto = pr.id_producto
-        {where_clause}
-        GROUP BY s.id_sucursal, s.nombre_sucursal, b.nombre_barrio, c.nombre_comercio
-        HAVING COUNT(p.id_precio) > 0
-        ORDER BY ultima_captura DESC, total_precios DESC;
-    ""
+    filters = read_filters(request.args)
+    columnar, format_error = read_format(request.args)
+    if format_error is not None:
+        return jsonify({"error": format_error}), 400
 
+    query, params = sucursales_query(filters)
     rows, error = run_query(query, params)
     if error is not None:
         return jsonify({"error": error}), 500
 
-    return jsonify({"sucursales": rows})
+    return jsonify({"sucursales": to_columns(rows, SUCURSAL_COLUMNS) if columnar else rows})
 
 
 @app.route("/api/precios")
 def api_precios() -> Any:
-    filters = {
-        "producto": request.args.get("producto", ""),
-        "barrio": request.args.get("barrio", ""),
-        "comercio": request.args.get("comercio", ""),
-        "fecha_desde": request.args.get("fecha_desde", ""),
-        "fecha_hasta": request.args.get("fecha_hasta", ""),
-    }
+    filters = read_filters(request.args)
+    columnar, format_error = read_format(request.args)
+    if format_error is not None:
+        return jsonify({"error": format_error}), 400
 
     precios, price_error = fetch_price_rows(filters)
     resumen, summary_error = fetch_price_summary(filters)
@@ -213,7 +129,73 @@ def api_precios() -> Any:
     if error is not None:
         return jsonify({"error": error}), 500
 
-    return jsonify({"precios": precios, "resumen": resumen})
+    return jsonify({"precios": to_columns(precios, PRICE_ROW_COLUMNS) if columnar else precios, "resumen": resumen})
+
+
+@app.route("/api/canasta")
+def api_canasta() -> Any:
+    productos, limite, arg_error = read_canasta_args(request.args)
+    if arg_error is not None:
+        return jsonify({"error": arg_error}), 400
+
+    query, params = canasta_query(productos, limite)
+    rows, error = run_query(query, params)
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    return jsonify({"productos": productos, "sucursales": rows})
+
+
+def current_map_version() -> Optional[int]:
+    """Versión del mapa de tiendas, leída de la base solo cuando la caché lo pide."""
+    if tile_cache.needs_version_check():
+        row, _ = run_query(STORE_MAP_VERSION_QUERY, fetch="one")
+        tile_cache.update_version(row["version"] if row else None)
+    return tile_cache.version
+
+
+@app.route("/tiles/stores/<int:z>/<int:x>/<int:y>.mvt")
+def store_tile(z: int, x: int, y: int) -> Any:
+    if not valid_tile(z, x, y):
+        return jsonify({"error": "Tesela fuera de rango."}), 404
+
+    version = current_map_version()
+    key = (z, x, y)
+    data = tile_cache.get(key)
+    if data is None:
+        query, params = store_tile_query(z, x, y)
+        row, error = run_query(query, params, fetch="one")
+        if error is not None:
+            return jsonify({"error": error}), 500
+        data = bytes(row["mvt"]) if row and row["mvt"] is not None else b""
+        tile_cache.put(key, version, data)
+
+    # La comparación se hace contra los bytes vigentes: si cambió el resumen de
+    # precios cambia el ETag aunque no haya cambiado la versión del mapa.
+    etag = tile_etag(data)
+    headers = {"Cache-Control": f"public, max-age={TILE_HTTP_MAX_AGE}"}
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(data, mimetype="application/vnd.mapbox-vector-tile", headers=headers)
+    response.set_etag(etag)
+    return response
+
+
+@app.route("/api/tiendas")
+def api_tiendas() -> Any:
+    bbox, limite, arg_error = read_bbox_args(request.args)
+    if arg_error is not None:
+        return jsonify({"error": arg_error}), 400
+
+    query, params = stores_geojson_query(bbox, limite)
+    row, error = run_query(query, params, fetch="one")
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    response = jsonify(row["geojson"])
+    response.mimetype = "application/geo+json"
+    return response
 
 
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+"""Modo de servicio asíncrono (ASGI) de la API de precios.
+
+Expone las mismas rutas, filtros y respuestas JSON que app.py, pero sobre
+psycopg 3 con un pool de conexiones asíncrono. Se ejecuta con un servidor ASGI:
+
+    uvicorn app_async:app --host 0.0.0.0 --port 8000
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from quart import Quart, Response, jsonify, request
+
+from consultas import (
+    DB_CONFIG,
+    PRICE_ROW_COLUMNS,
+    STORE_MAP_VERSION_QUERY,
+    SUCURSAL_COLUMNS,
+    TILE_HTTP_MAX_AGE,
+    canasta_query,
+    price_rows_query,
+    price_summary_query,
+    read_bbox_args,
+    read_canasta_args,
+    read_filters,
+    read_format,
+    store_tile_query,
+    stores_geojson_query,
+    sucursales_query,
+    valid_tile,
+)
+from serializacion import FastJSONProvider
+from src.json_codec import to_columns
+from tile_cache import TileCache, tile_etag
+
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 20
+POOL_TIMEOUT_SECONDS = 10.0
+
+app = Quart(__name__)
+app.json = FastJSONProvider(app)
+
+tile_cache = TileCache()
+
+pool: Optional[AsyncConnectionPool] = None
+
+
+@app.before_serving
+async def open_pool() -> None:
+    """Abre el pool de conexiones al iniciar el servidor."""
+    global pool
+    pool = AsyncConnectionPool(
+        make_conninfo(**DB_CONFIG),
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT_SECONDS,
+        kwargs={"autocommit": True, "row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+
+
+@app.after_serving
+async def close_pool() -> None:
+    """Cierra el pool de conexiones al detener el servidor."""
+    if pool is not None:
+        await pool.close()
+
+
+async def run_query(
+    query: str,
+    params: Optional[Sequence[object]] = None,
+    fetch: str = "all",
+) -> Tuple[Optional[Any], Optional[str]]:
+    """Ejecuta una consulta con una conexión del pool y devuelve filas y un posible error."""
+    if pool is None:
+        return None, "No se pudo conectar a la base de datos."
+
+    try:
+        async with pool.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(query, params)
+                if fetch == "one":
+                    return await cursor.fetchone(), None
+                return await cursor.fetchall(), None
+    except PoolTimeout as exc:
+        app.logger.error("No se pudo obtener una conexión del pool: %s", exc)
+        return None, "No se pudo conectar a la base de datos."
+    except psycopg.Error as exc:
+        app.logger.error("Falló la ejecución de la consulta: %s", exc)
+        return None, "Ocurrió un problema al consultar la base de datos."
+    except Exception as exc:  # noqa: BLE001
+        app.logger.exception("Error inesperado durante la consulta: %s", exc)
+        return None, "Ocurrió un error inesperado durante la consulta."
+
+
+async def fetch_price_rows(filters: Dict[str, str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    query, params = price_rows_query(filters)
+    rows, error = await run_query(query, params)
+    return rows or [], error
+
+
+async def fetch_price_summary(filters: Dict[str, str]) -> Tuple[Dict[str, Any], Optional[str]]:
+    query, params = price_summary_query(filters)
+    summary, error = await run_query(query, params, fetch="one")
+    return summary or {}, error
+
+
+@app.route("/api/sucursales")
+async def api_sucursales() -> Any:
+    filters = read_filters(request.args)
+    columnar, format_error = read_format(request.args)
+    if format_error is not None:
+        return jsonify({"error": format_error}), 400
+
+    query, params = sucursales_query(filters)
+    rows, error = await run_query(query, params)
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    return jsonify({"sucursales": to_columns(rows, SUCURSAL_COLUMNS) if columnar else rows})
+
+
+@app.route("/api/precios")
+async def api_precios() -> Any:
+    filters = read_filters(request.args)
+    columnar, format_error = read_format(request.args)
+    if format_error is not None:
+        return jsonify({"error": format_error}), 400
+
+    # Las dos consultas son independientes: se ejecutan en paralelo con conexiones distintas.
+    (precios, price_error), (resumen, summary_error) = await asyncio.gather(
+        fetch_price_rows(filters),
+        fetch_price_summary(filters),
+    )
+    error = price_error or summary_error
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    return jsonify({"precios": to_columns(precios, PRICE_ROW_COLUMNS) if columnar else precios, "resumen": resumen})
+
+
+@app.route("/api/canasta")
+async def api_canasta() -> Any:
+    productos, limite, arg_error = read_canasta_args(request.args)
+    if arg_error is not None:
+        return jsonify({"error": arg_error}), 400
+
+    query, params = canasta_query(productos, limite)
+    rows, error = await run_query(query, params)
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    return jsonify({"productos": productos, "sucursales": rows})
+
+
+async def current_map_version() -> Optional[int]:
+    """Versión del mapa de tiendas, leída de la base solo cuando la caché lo pide."""
+    if tile_cache.needs_version_check():
+        row, _ = await run_query(STORE_MAP_VERSION_QUERY, fetch="one")
+        tile_cache.update_version(row["version"] if row else None)
+    return tile_cache.version
+
+
+@app.route("/tiles/stores/<int:z>/<int:x>/<int:y>.mvt")
+async def store_tile(z: int, x: int, y: int) -> Any:
+    if not valid_tile(z, x, y):
+        return jsonify({"error": "Tesela fuera de rango."}), 404
+
+    version = await current_map_version()
+    key = (z, x, y)
+    data = tile_cache.get(key)
+    if data is None:
+        query, params = store_tile_query(z, x, y)
+        row, error = await run_query(query, params, fetch="one")
+        if error is not None:
+            return jsonify({"error": error}), 500
+        data = bytes(row["mvt"]) if row and row["mvt"] is not None else b""
+        tile_cache.put(key, version, data)
+
+    # La comparación se hace contra los bytes vigentes: si cambió el resumen de
+    # precios cambia el ETag aunque no haya cambiado la versión del mapa.
+    etag = tile_etag(data)
+    headers = {"Cache-Control": f"public, max-age={TILE_HTTP_MAX_AGE}"}
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(data, mimetype="application/vnd.mapbox-vector-tile", headers=headers)
+    response.set_etag(etag)
+    return response
+
+
+@app.route("/api/tiendas")
+async def api_tiendas() -> Any:
+    bbox, limite, arg_error = read_bbox_args(request.args)
+    if arg_error is not None:
+        return jsonify({"error": arg_error}), 400
+
+    query, params = stores_geojson_query(bbox, limite)
+    row, error = await run_query(query, params, fetch="one")
+    if error is not None:
+        return jsonify({"error": error}), 500
+
+    response = jsonify(row["geojson"])
+    response.mimetype = "application/geo+json"
+    return response
@@ -0,0 +1,129 @@
+"""Micro-benchmark del costo de serialización JSON por fila.
+
+Compara el camino anterior (json de la biblioteca estándar con las opciones del
+proveedor por defecto de Flask, y `json.dumps(place)` para `raw_json`) con
+`src.json_codec`, en filas con la forma de las que devuelve la API.
+
+    python -m bench.bench_json --filas 20000 --repeticiones 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from email.utils import format_datetime
+from typing import Any, Callable, Dict, Iterable, List
+
+from consultas import PRICE_ROW_COLUMNS
+from src import json_codec
+
+from .vocabulario import BARRIOS, COMERCIOS, FUENTES, PRODUCTOS_BASE
+
+
+def _flask_default(value: Any) -> Any:
+    """Equivalente a lo que hace el DefaultJSONProvider de Flask con estos tipos."""
+    if isinstance(value, date):
+        return format_datetime(datetime(value.year, value.month, value.day, tzinfo=timezone.utc), usegmt=True)
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(type(value).__name__)
+
+
+def stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_flask_default, ensure_ascii=True, sort_keys=True, separators=(",", ":")).encode()
+
+
+def price_rows(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    today = date.today()
+    return [
+        {
+            "id_precio": index,
+            "producto": f"{rng.choice(PRODUCTOS_BASE)} 1 kg",
+            "marca": "Marca Propia",
+            "nombre_sucursal": f"Sucursal {rng.randint(1, 500):05d}",
+            "nombre_barrio": rng.choice(BARRIOS),
+            "nombre_comercio": rng.choice(COMERCIOS),
+            "nombre_fuente": rng.choice(FUENTES),
+            "precio_lista": Decimal(f"{rng.uniform(20, 900):.2f}"),
+            "fecha_captura": today - timedelta(days=rng.randint(0, 700)),
+        }
+        for index in range(count)
+    ]
+
+
+def places(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"ChIJ{rng.getrandbits(96):024x}",
+            "displayName": {"text": f"{rng.choice(COMERCIOS)} {rng.choice(BARRIOS)}", "languageCode": "es"},
+            "formattedAddress": f"Av. Italia {rng.randint(100, 9999)}, 11300 Montevideo, Departamento de Montevideo, Uruguay",
+            "location": {"latitude": rng.uniform(-34.95, -34.80), "longitude": rng.uniform(-56.30, -56.05)},
+            "primaryType": "supermarket",
+            "types": ["supermarket", "grocery_store", "food", "point_of_interest", "store", "establishment"],
+        }
+        for _ in range(count)
+    ]
+
+
+def measure(label: str, encode: Callable[[], bytes], rows: int, repetitions: int) -> float:
+    best = float("inf")
+    size = 0
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        size = len(encode())
+        best = min(best, time.perf_counter() - started)
+    per_row_us = best / rows * 1e6
+    print(f"{label:<42} {per_row_us:>8.2f} µs/fila {size / rows:>8.1f} bytes/fila")
+    return per_row_us
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Costo de serialización JSON por fila")
+    parser.add_argument("--filas", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+    rng = random.Random(args.semilla)
+    rows = price_rows(rng, args.filas)
+    payload = {"precios": rows}
+    columnar = {"precios": json_codec.to_columns(rows, PRICE_ROW_COLUMNS)}
+    raw_places = places(rng, args.filas)
+
+    print(f"backend de src.json_codec: {json_codec.BACKEND}\n")
+    before = measure("API filas, stdlib (como Flask)", lambda: stdlib_dumps(payload), args.filas, args.repeticiones)
+    after = measure("API filas, json_codec", lambda: json_codec.dumps(payload), args.filas, args.repeticiones)
+    measure(
+        "API columnas, json_codec (incluye pivot)",
+        lambda: json_codec.dumps({"precios": json_codec.to_columns(rows, PRICE_ROW_COLUMNS)}),
+        args.filas,
+        args.repeticiones,
+    )
+    measure("API columnas, json_codec (solo encode)", lambda: json_codec.dumps(columnar), args.filas, args.repeticiones)
+    print(f"  -> filas: {before / after:.1f}x más rápido\n")
+
+    before = measure(
+        "raw_json, json.dumps por lugar",
+        lambda: b"".join(json.dumps(place).encode() for place in raw_places),
+        args.filas,
+        args.repeticiones,
+    )
+    after = measure(
+        "raw_json, json_codec.dumps por lugar",
+        lambda: b"".join(json_codec.dumps(place) for place in raw_places),
+        args.filas,
+        args.repeticiones,
+    )
+    print(f"  -> raw_json: {before / after:.1f}x más rápido")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,242 @@
+"""Prueba de carga HTTP de la API de precios.
+
+Reproduce una mezcla de peticiones con filtros aleatorios contra `/`,
+`/api/precios`, `/api/sucursales` y `/api/canasta`, y reporta throughput y
+percentiles de latencia por endpoint. Cada corrida se guarda en
+`bench/resultados/` junto con el commit, para poder comparar versiones.
+
+    python -m bench.carga_api correr --url http://localhost:5000 --duracion 60 --concurrencia 16
+    python -m bench.carga_api comparar bench/resultados/A.json bench/resultados/B.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .vocabulario import BARRIOS, COMERCIOS, PRODUCTOS_BASE
+
+RESULTS_DIR = Path(__file__).resolve().parent / "resultados"
+
+ENDPOINTS = {
+    "index": "/",
+    "precios": "/api/precios",
+    "sucursales": "/api/sucursales",
+    "canasta": "/api/canasta",
+}
+DEFAULT_MIX = "precios=4,sucursales=3,index=2,canasta=1"
+VENTANAS_DIAS = [7, 30, 90, 365]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Convierte `precios=4,sucursales=3` en pesos por endpoint."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Endpoint desconocido {name!r}")
+        try:
+            mix[name] = int(weight)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(f"Peso inválido para {name!r}") from exc
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("La mezcla necesita al menos un peso positivo")
+    return mix
+
+
+def random_filters(rng: random.Random) -> Dict[str, str]:
+    """Combinación de filtros parecida a la de un usuario real."""
+    params = {}
+    if rng.random() < 0.6:
+        params["producto"] = rng.choice(PRODUCTOS_BASE)
+    if rng.random() < 0.3:
+        params["barrio"] = rng.choice(BARRIOS)
+    if rng.random() < 0.2:
+        params["comercio"] = rng.choice(COMERCIOS)
+    if rng.random() < 0.5:
+        params["fecha_desde"] = (date.today() - timedelta(days=rng.choice(VENTANAS_DIAS))).isoformat()
+    return params
+
+
+def request_params(endpoint: str, rng: random.Random) -> Dict[str, Any]:
+    if endpoint == "canasta":
+        return {"producto": rng.sample(PRODUCTOS_BASE, rng.randint(2, 10))}
+    return random_filters(rng)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "peticiones": len(latencies),
+        "errores": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(ordered, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=False).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None, "sucio": bool(git("status", "--porcelain"))}
+
+
+def run_load(
+    base_url: str,
+    mix: Dict[str, int],
+    duration: float,
+    concurrency: int,
+    seed: int,
+    timeout: float,
+) -> Dict[str, Any]:
+    """Bucle cerrado: cada hilo envía una petición apenas recibe la anterior."""
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                response = session.get(
+                    base_url.rstrip("/") + ENDPOINTS[endpoint],
+                    params=request_params(endpoint, rng),
+                    timeout=timeout,
+                )
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[endpoint].append(elapsed)
+                if failed:
+                    errors[endpoint] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "duracion_s": round(elapsed, 2),
+    }
+
+
+def save_result(result: Dict[str, Any], label: Optional[str]) -> Path:
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    commit = (result["git"]["commit"] or "sin-git")[:10]
+    suffix = f"_{label}" if label else ""
+    path = RESULTS_DIR / f"{stamp}_{commit}{suffix}.json"
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"{'ENDPOINT':<12} {'PETIC':>8} {'ERR':>6} {'RPS':>9} {'P50 ms':>9} {'P90 ms':>9} {'P99 ms':>9}")
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:<12} {stats['peticiones']:>8} {stats['errores']:>6} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.1f} {stats['p90_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        )
+
+
+def compare_results(base: Dict[str, Any], other: Dict[str, Any]) -> List[Tuple[str, str, float, float]]:
+    """Devuelve (endpoint, métrica, valor base, valor nuevo) para las métricas comunes."""
+    rows = []
+    for name, stats in other["endpoints"].items():
+        if name not in base["endpoints"]:
+            continue
+        for metric in ("rps", "p50_ms", "p90_ms", "p99_ms"):
+            rows.append((name, metric, base["endpoints"][name][metric], stats[metric]))
+    return rows
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP de la API de precios")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = subparsers.add_parser("correr", help="Ejecuta una corrida de carga")
+    run_cmd.add_argument("--url", default="http://localhost:5000", help="URL base de la API")
+    run_cmd.add_argument("--duracion", type=float, default=60.0, help="Segundos de carga")
+    run_cmd.add_argument("--concurrencia", type=int, default=16, help="Clientes simultáneos")
+    run_cmd.add_argument("--mezcla", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="Pesos por endpoint")
+    run_cmd.add_argument("--semilla", type=int, default=1, help="Semilla de los filtros aleatorios")
+    run_cmd.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición en segundos")
+    run_cmd.add_argument("--etiqueta", default=None, help="Sufijo para el archivo de resultados")
+
+    compare_cmd = subparsers.add_parser("comparar", help="Compara dos corridas guardadas")
+    compare_cmd.add_argument("base", type=Path)
+    compare_cmd.add_argument("nuevo", type=Path)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+
+    if args.command == "correr":
+        result = run_load(args.url, args.mezcla, args.duracion, args.concurrencia, args.semilla, args.timeout)
+        result.update(
+            {
+                "fecha": datetime.now(timezone.utc).isoformat(),
+                "git": git_revision(),
+                "parametros": {
+                    "url": args.url,
+                    "duracion": args.duracion,
+                    "concurrencia": args.concurrencia,
+                    "mezcla": args.mezcla,
+                    "semilla": args.semilla,
+                },
+            }
+        )
+        print_result(result)
+        print(f"\nResultados guardados en {save_result(result, args.etiqueta)}")
+    elif args.command == "comparar":
+        base = json.loads(args.base.read_text(encoding="utf-8"))
+        nuevo = json.loads(args.nuevo.read_text(encoding="utf-8"))
+        print(f"{'ENDPOINT':<12} {'MÉTRICA':<8} {'BASE':>10} {'NUEVO':>10} {'CAMBIO':>9}")
+        for name, metric, old, new in compare_results(base, nuevo):
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            print(f"{name:<12} {metric:<8} {old:>10.1f} {new:>10.1f} {change:>9}")
+    else:
+        raise ValueError(f"Unsupported command {args.command}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
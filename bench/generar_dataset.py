@@ -0,0 +1,247 @@
+"""Generador de datos sintéticos para nexo_precios.
+
+Crea el esquema base (bench/schema_nexo_precios.sql), aplica las migraciones
+de `precio` y carga dimensiones y precios con sesgo realista: pocos productos
+y sucursales concentran la mayoría de los precios (Zipf), las capturas se
+acumulan en las fechas recientes y los precios suben con una inflación suave.
+
+    python -m bench.generar_dataset --dsn postgresql://localhost/nexo_precios --precios 1e6
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+
+from consultas import DB_CONFIG
+from src.precio_partitions import add_months, create_partitions
+
+from .vocabulario import BARRIOS, COMERCIOS, FUENTES, MARCAS, PRESENTACIONES, PRODUCTOS_BASE, VARIANTES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_FILE = Path(__file__).resolve().parent / "schema_nexo_precios.sql"
+MIGRATIONS = [
+    ROOT / "migrations" / "002_partition_precio.sql",
+    ROOT / "migrations" / "003_precio_actual.sql",
+]
+
+ZIPF_EXPONENT = 1.1
+INFLACION_MENSUAL = 0.006
+
+
+def parse_scale(value: str) -> int:
+    """Acepta enteros o notación científica (`1e6`)."""
+    try:
+        number = int(float(value))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Cantidad inválida {value!r}") from exc
+    if number <= 0:
+        raise argparse.ArgumentTypeError("La cantidad debe ser positiva")
+    return number
+
+
+def zipf_cum_weights(count: int, exponent: float = ZIPF_EXPONENT) -> List[float]:
+    total = 0.0
+    cumulative = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank**exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def dimension_sizes(precios: int) -> Tuple[int, int]:
+    """Cantidad de productos y sucursales para una escala de precios dada."""
+    productos = min(50_000, max(200, int(math.sqrt(precios) * 2)))
+    sucursales = min(3_000, max(30, int(precios ** (1 / 3))))
+    return productos, sucursales
+
+
+def apply_sql_file(conninfo: str, path: Path) -> None:
+    logger.info("Aplicando %s", path.name)
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute(path.read_text(encoding="utf-8"))
+
+
+def truncate_data(conn: psycopg.Connection) -> None:
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE precio, producto, sucursal, barrio, comercio, fuente_datos RESTART IDENTITY CASCADE")
+        cur.execute("SELECT to_regclass('precio_actual')")
+        if cur.fetchone()[0] is not None:
+            cur.execute("TRUNCATE precio_actual")
+    conn.commit()
+
+
+def ensure_named_rows(conn: psycopg.Connection, table: str, id_column: str, name_column: str, names: Sequence[str]) -> List[int]:
+    with conn.cursor() as cur:
+        cur.executemany(
+            f"INSERT INTO {table} ({name_column}) VALUES (%s) ON CONFLICT ({name_column}) DO NOTHING",
+            [(name,) for name in names],
+        )
+        cur.execute(f"SELECT {id_column} FROM {table} ORDER BY {id_column}")
+        return [row[0] for row in cur.fetchall()]
+
+
+def ensure_productos(conn: psycopg.Connection, rng: random.Random, count: int) -> List[int]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM producto")
+        missing = count - cur.fetchone()[0]
+        if missing > 0:
+            rows = []
+            for _ in range(missing):
+                nombre = f"{rng.choice(PRODUCTOS_BASE)}{rng.choice(VARIANTES)} {rng.choice(PRESENTACIONES)}"
+                rows.append((nombre, rng.choice(MARCAS)))
+            cur.executemany("INSERT INTO producto (nombre, marca) VALUES (%s, %s)", rows)
+        cur.execute("SELECT id_producto FROM producto ORDER BY id_producto")
+        return [row[0] for row in cur.fetchall()]
+
+
+def ensure_sucursales(
+    conn: psycopg.Connection,
+    rng: random.Random,
+    count: int,
+    barrios: Sequence[int],
+    comercios: Sequence[int],
+) -> List[int]:
+    comercio_weights = zipf_cum_weights(len(comercios))
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM sucursal")
+        existing = cur.fetchone()[0]
+        rows = []
+        for index in range(existing, count):
+            id_comercio = rng.choices(comercios, cum_weights=comercio_weights)[0]
+            id_barrio = rng.choice(barrios)
+            rows.append((f"Sucursal {index + 1:05d}", id_barrio, id_comercio))
+        if rows:
+            cur.executemany(
+                "INSERT INTO sucursal (nombre_sucursal, id_barrio, id_comercio) VALUES (%s, %s, %s)",
+                rows,
+            )
+        cur.execute("SELECT id_sucursal FROM sucursal ORDER BY id_sucursal")
+        return [row[0] for row in cur.fetchall()]
+
+
+def ensure_partitions(conn: psycopg.Connection, first_day: date) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regproc('precio_crear_particion')")
+        if cur.fetchone()[0] is None:
+            return
+    start = first_day.replace(day=1)
+    today = date.today().replace(day=1)
+    months = (today.year - start.year) * 12 + today.month - start.month
+    create_partitions(conn, start, months + 3)
+    conn.commit()
+    logger.info("Particiones listas desde %s hasta %s", start, add_months(today, 3))
+
+
+def generate_prices(
+    rng: random.Random,
+    count: int,
+    productos: Sequence[int],
+    sucursales: Sequence[int],
+    fuentes: Sequence[int],
+    dias: int,
+) -> Iterable[Tuple[int, int, int, float, date]]:
+    """Genera filas de precio con popularidad Zipf y fechas sesgadas a lo reciente."""
+    producto_weights = zipf_cum_weights(len(productos))
+    sucursal_weights = zipf_cum_weights(len(sucursales))
+    fuente_weights = zipf_cum_weights(len(fuentes), exponent=1.5)
+    base_price = {id_producto: rng.lognormvariate(math.log(120), 0.9) for id_producto in productos}
+    store_factor = {id_sucursal: rng.gauss(1.0, 0.08) for id_sucursal in sucursales}
+    today = date.today()
+    mean_age = dias / 4
+
+    chunk = 10_000
+    produced = 0
+    while produced < count:
+        size = min(chunk, count - produced)
+        producto_ids = rng.choices(productos, cum_weights=producto_weights, k=size)
+        sucursal_ids = rng.choices(sucursales, cum_weights=sucursal_weights, k=size)
+        fuente_ids = rng.choices(fuentes, cum_weights=fuente_weights, k=size)
+        for id_producto, id_sucursal, id_fuente in zip(producto_ids, sucursal_ids, fuente_ids):
+            age = min(int(rng.expovariate(1 / mean_age)), dias - 1)
+            inflation = (1 + INFLACION_MENSUAL) ** (-age / 30)
+            price = base_price[id_producto] * store_factor[id_sucursal] * inflation * rng.uniform(0.95, 1.05)
+            yield id_producto, id_sucursal, id_fuente, round(max(price, 1.0), 2), today - timedelta(days=age)
+        produced += size
+
+
+def load_prices(conn: psycopg.Connection, rows: Iterable[Tuple], total: int, batch_size: int) -> None:
+    """Carga los precios con COPY, confirmando cada `batch_size` filas."""
+    started = time.perf_counter()
+    loaded = 0
+    iterator = iter(rows)
+    while loaded < total:
+        size = min(batch_size, total - loaded)
+        with conn.cursor() as cur:
+            with cur.copy(
+                "COPY precio (id_producto, id_sucursal, id_fuente, precio_lista, fecha_captura) FROM STDIN"
+            ) as copy:
+                for _ in range(size):
+                    copy.write_row(next(iterator))
+        conn.commit()
+        loaded += size
+        elapsed = time.perf_counter() - started
+        logger.info("Cargados %s/%s precios (%.0f filas/s)", loaded, total, loaded / elapsed)
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético de nexo_precios")
+    parser.add_argument("--dsn", default=make_conninfo(**DB_CONFIG), help="Cadena de conexión a la base local")
+    parser.add_argument("--precios", type=parse_scale, default=100_000, help="Cantidad de precios (1e5 a 1e8)")
+    parser.add_argument("--dias", type=int, default=730, help="Días de historia hacia atrás")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador aleatorio")
+    parser.add_argument("--lote", type=parse_scale, default=500_000, help="Filas por COPY confirmado")
+    parser.add_argument("--reiniciar", action="store_true", help="Vacía las tablas antes de cargar")
+    parser.add_argument("--sin-migraciones", action="store_true", help="No aplica las migraciones 002 y 003")
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+    rng = random.Random(args.semilla)
+
+    apply_sql_file(args.dsn, SCHEMA_FILE)
+    if not args.sin_migraciones:
+        for migration in MIGRATIONS:
+            apply_sql_file(args.dsn, migration)
+
+    with psycopg.connect(args.dsn) as conn:
+        if args.reiniciar:
+            truncate_data(conn)
+
+        n_productos, n_sucursales = dimension_sizes(args.precios)
+        fuentes = ensure_named_rows(conn, "fuente_datos", "id_fuente", "nombre_fuente", FUENTES)
+        barrios = ensure_named_rows(conn, "barrio", "id_barrio", "nombre_barrio", BARRIOS)
+        comercios = ensure_named_rows(conn, "comercio", "id_comercio", "nombre_comercio", COMERCIOS)
+        productos = ensure_productos(conn, rng, n_productos)
+        sucursales = ensure_sucursales(conn, rng, n_sucursales, barrios, comercios)
+        conn.commit()
+        logger.info("Dimensiones: %s productos, %s sucursales", len(productos), len(sucursales))
+
+        ensure_partitions(conn, date.today() - timedelta(days=args.dias))
+        rows = generate_prices(rng, args.precios, productos, sucursales, fuentes, args.dias)
+        load_prices(conn, rows, args.precios, args.lote)
+
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,41 @@
+-- Esquema base de nexo_precios para bases locales de prueba
+--
+-- Lo usa bench/generar_dataset.py antes de aplicar las migraciones 002 y 003.
+-- `precio` se crea sin particionar; 002 la convierte.
+
+CREATE TABLE IF NOT EXISTS fuente_datos (
+    id_fuente SERIAL PRIMARY KEY,
+    nombre_fuente TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS barrio (
+    id_barrio SERIAL PRIMARY KEY,
+    nombre_barrio TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS comercio (
+    id_comercio SERIAL PRIMARY KEY,
+    nombre_comercio TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS sucursal (
+    id_sucursal SERIAL PRIMARY KEY,
+    nombre_sucursal TEXT NOT NULL,
+    id_barrio INTEGER NOT NULL REFERENCES barrio(id_barrio),
+    id_comercio INTEGER NOT NULL REFERENCES comercio(id_comercio)
+);
+
+CREATE TABLE IF NOT EXISTS producto (
+    id_producto SERIAL PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    marca TEXT NULL
+);
+
+CREATE TABLE IF NOT EXISTS precio (
+    id_precio BIGSERIAL PRIMARY KEY,
+    id_producto INTEGER NOT NULL REFERENCES producto(id_producto),
+    id_sucursal INTEGER NOT NULL REFERENCES sucursal(id_sucursal),
+    id_fuente INTEGER NOT NULL REFERENCES fuente_datos(id_fuente),
+    precio_lista NUMERIC(12, 2) NOT NULL,
+    fecha_captura DATE NOT NULL
+);
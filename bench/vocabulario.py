@@ -0,0 +1,33 @@
+"""Nombres usados por el generador de datos y por la prueba de carga."""
+
+FUENTES = ["relevamiento", "sitio_web", "ticket", "app_movil"]
+
+BARRIOS = [
+    "Aguada", "Atahualpa", "Bella Vista", "Brazo Oriental", "Buceo", "Capurro", "Carrasco",
+    "Casabó", "Centro", "Cerrito", "Cerro", "Ciudad Vieja", "Colón", "Cordón", "Flor de Maroñas",
+    "Goes", "Jacinto Vera", "La Blanqueada", "La Comercial", "La Figurita", "La Teja", "Larrañaga",
+    "Las Acacias", "Malvín", "Malvín Norte", "Manga", "Maroñas", "Nuevo París", "Palermo",
+    "Parque Batlle", "Parque Rodó", "Paso de la Arena", "Paso Molino", "Peñarol", "Piedras Blancas",
+    "Pocitos", "Prado", "Punta Carretas", "Punta Gorda", "Reducto", "Sayago", "Tres Cruces",
+    "Unión", "Villa Dolores", "Villa Española", "Villa Muñoz",
+]
+
+COMERCIOS = [
+    "Super Avenida", "Mercado del Barrio", "Almacén La Esquina", "Hiper Sur", "Autoservicio Central",
+    "Supermercado Norte", "Mini Market 24", "Distribuidora Oeste", "Almacén Don José",
+    "Súper Familiar", "Mercadito Express", "Gran Mayorista",
+]
+
+# Términos base de producto; la prueba de carga los usa para armar filtros que coincidan.
+PRODUCTOS_BASE = [
+    "Leche", "Yerba", "Arroz", "Fideos", "Harina", "Azúcar", "Aceite", "Café", "Pan", "Manteca",
+    "Queso", "Yogur", "Huevos", "Galletitas", "Dulce de leche", "Atún", "Tomate", "Lentejas",
+    "Polenta", "Sal", "Jabón", "Detergente", "Papel higiénico", "Shampoo", "Agua", "Refresco",
+    "Cerveza", "Vino", "Jugo", "Mermelada",
+]
+VARIANTES = ["", " light", " integral", " premium", " económico", " familiar", " sin sal", " orgánico"]
+PRESENTACIONES = ["250 g", "500 g", "1 kg", "1 L", "1,5 L", "2 L", "unidad", "pack x6", "pack x12"]
+MARCAS = [
+    "La Serrana", "Del Campo", "Don Pedro", "Río Claro", "Santa Ana", "El Trigal", "Nativa",
+    "Buen Día", "Costa Azul", "Marca Propia", None,
+]
@@ -0,0 +1,370 @@
+"""Configuración y SQL compartidos por app.py y app_async.py."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+DB_CONFIG: Dict[str, Any] = {
+    "dbname": "nexo_precios",
+    "user": "TU_USUARIO_AQUI",
+    "password": "TU_PASSWORD_AQUI",
+    "host": "localhost",
+    "port": 5432,
+}
+
+FILTER_FIELDS = {
+    "producto": "pr.nombre",
+    "barrio": "b.nombre_barrio",
+    "comercio": "c.nombre_comercio",
+}
+
+FILTER_NAMES = ("producto", "barrio", "comercio", "fecha_desde", "fecha_hasta")
+
+
+def read_filters(args: Mapping[str, str]) -> Dict[str, str]:
+    """Extrae los filtros conocidos de los parámetros de la petición."""
+    return {name: args.get(name, "") for name in FILTER_NAMES}
+
+
+def read_format(args: Mapping[str, str]) -> Tuple[bool, Optional[str]]:
+    """Indica si se pidió la respuesta por columnas (`?formato=columnas`) y un posible error."""
+    formato = args.get("formato", "filas")
+    if formato not in ("filas", "columnas"):
+        return False, "El parámetro formato debe ser 'filas' o 'columnas'."
+    return formato == "columnas", None
+
+
+def build_filter_clause(args: Dict[str, str]) -> Tuple[str, List[object]]:
+    conditions: List[str] = []
+    params: List[object] = []
+
+    for field, column in FILTER_FIELDS.items():
+        value = args.get(field, "").strip()
+        if value:
+            conditions.append(f"{column} ILIKE %s")
+            params.append(f"%{value}%")
+
+    fecha_desde = args.get("fecha_desde", "").strip()
+    if fecha_desde:
+        conditions.append("p.fecha_captura >= %s")
+        params.append(fecha_desde)
+
+    fecha_hasta = args.get("fecha_hasta", "").strip()
+    if fecha_hasta:
+        conditions.append("p.fecha_captura <= %s")
+        params.append(fecha_hasta)
+
+    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+
+# Columnas de cada consulta, para armar respuestas por columnas aunque no haya filas.
+PRICE_ROW_COLUMNS = (
+    "id_precio",
+    "producto",
+    "marca",
+    "nombre_sucursal",
+    "nombre_barrio",
+    "nombre_comercio",
+    "nombre_fuente",
+    "precio_lista",
+    "fecha_captura",
+)
+
+SUCURSAL_COLUMNS = (
+    "id_sucursal",
+    "nombre_sucursal",
+    "nombre_barrio",
+    "nombre_comercio",
+    "total_precios",
+    "ultima_captura",
+    "precio_minimo",
+)
+
+
+def price_rows_query(filters: Dict[str, str]) -> Tuple[str, List[object]]:
+    where_clause, params = build_filter_clause(filters)
+    query = f"""
+        SELECT
+            p.id_precio,
+            pr.nombre AS producto,
+            pr.marca,
+            s.nombre_sucursal,
+            b.nombre_barrio,
+            c.nombre_comercio,
+            f.nombre_fuente,
+            p.precio_lista,
+            p.fecha_captura
+        FROM precio AS p
+        JOIN producto AS pr ON p.id_producto = pr.id_producto
+        JOIN sucursal AS s ON p.id_sucursal = s.id_sucursal
+        JOIN barrio AS b ON s.id_barrio = b.id_barrio
+        JOIN comercio AS c ON s.id_comercio = c.id_comercio
+        JOIN fuente_datos AS f ON p.id_fuente = f.id_fuente
+        {where_clause}
+        ORDER BY p.fecha_captura DESC, p.id_precio DESC;
+    """
+    return query, params
+
+
+def price_summary_query(filters: Dict[str, str]) -> Tuple[str, List[object]]:
+    where_clause, params = build_filter_clause(filters)
+    query = f"""
+        SELECT
+            MIN(p.precio_lista) AS precio_minimo,
+            MAX(p.precio_lista) AS precio_maximo,
+            AVG(p.precio_lista) AS precio_promedio,
+            COUNT(*) AS total_precios
+        FROM precio AS p
+        JOIN producto AS pr ON p.id_producto = pr.id_producto
+        JOIN sucursal AS s ON p.id_sucursal = s.id_sucursal
+        JOIN barrio AS b ON s.id_barrio = b.id_barrio
+        JOIN comercio AS c ON s.id_comercio = c.id_comercio
+        {where_clause};
+    """
+    return query, params
+
+
+def sucursales_query(filters: Dict[str, str]) -> Tuple[str, List[object]]:
+    where_clause, params = build_filter_clause(filters)
+
+    precio_minimo_expr = "MIN(p.precio_lista) AS precio_minimo" if filters.get("producto") else "NULL AS precio_minimo"
+
+    query = f"""
+        SELECT
+            s.id_sucursal,
+            s.nombre_sucursal,
+            b.nombre_barrio,
+            c.nombre_comercio,
+            COUNT(p.id_precio) AS total_precios,
+            MAX(p.fecha_captura) AS ultima_captura,
+            {precio_minimo_expr}
+        FROM sucursal AS s
+        JOIN barrio AS b ON s.id_barrio = b.id_barrio
+        JOIN comercio AS c ON s.id_comercio = c.id_comercio
+        JOIN precio AS p ON p.id_sucursal = s.id_sucursal
+        JOIN producto AS pr ON p.id_producto = pr.id_producto
+        {where_clause}
+        GROUP BY s.id_sucursal, s.nombre_sucursal, b.nombre_barrio, c.nombre_comercio
+        HAVING COUNT(p.id_precio) > 0
+        ORDER BY ultima_captura DESC, total_precios DESC;
+    """
+    return query, params
+
+
+CANASTA_MAX_PRODUCTOS = 50
+CANASTA_LIMITE_POR_DEFECTO = 20
+CANASTA_LIMITE_MAXIMO = 100
+
+
+def canasta_query(productos: List[str], limite: int) -> Tuple[str, List[object]]:
+    """Ranking de sucursales por costo total de la canasta usando `precio_actual`.
+
+    Cada término se busca por nombre parcial; si varios productos coinciden con
+    un mismo término se toma el más barato de la sucursal. Primero aparecen las
+    sucursales que tienen todos los productos y, entre ellas, las más baratas.
+    """
+    query = """
+        WITH pedido AS (
+            SELECT termino, posicion
+            FROM unnest(%s::text[]) WITH ORDINALITY AS t(termino, posicion)
+        ),
+        candidatos AS (
+            SELECT pe.posicion, pa.id_sucursal, MIN(pa.precio_lista) AS precio_lista
+            FROM pedido AS pe
+            JOIN producto AS pr ON pr.nombre ILIKE '%%' || pe.termino || '%%'
+            JOIN precio_actual AS pa ON pa.id_producto = pr.id_producto
+            GROUP BY pe.posicion, pa.id_sucursal
+        )
+        SELECT
+            s.id_sucursal,
+            s.nombre_sucursal,
+            b.nombre_barrio,
+            c.nombre_comercio,
+            COUNT(*) AS productos_encontrados,
+            %s - COUNT(*) AS productos_faltantes,
+            SUM(ca.precio_lista) AS costo_total
+        FROM candidatos AS ca
+        JOIN sucursal AS s ON ca.id_sucursal = s.id_sucursal
+        JOIN barrio AS b ON s.id_barrio = b.id_barrio
+        JOIN comercio AS c ON s.id_comercio = c.id_comercio
+        GROUP BY s.id_sucursal, s.nombre_sucursal, b.nombre_barrio, c.nombre_comercio
+        ORDER BY productos_faltantes ASC, costo_total ASC, s.id_sucursal
+        LIMIT %s;
+    """
+    return query, [productos, len(productos), limite]
+
+
+def read_canasta_args(args: Any) -> Tuple[List[str], int, Optional[str]]:
+    """Valida los parámetros de /api/canasta y devuelve productos, límite y un posible error.
+
+    Los productos se reciben repitiendo el parámetro (`?producto=leche&producto=pan`)
+    o separados por comas (`?productos=leche,pan`).
+    """
+    terms = list(args.getlist("producto"))
+    terms.extend(args.get("productos", "").split(","))
+    productos = list(dict.fromkeys(term.strip() for term in terms if term.strip()))
+    if not productos:
+        return [], 0, "Debe indicar al menos un producto."
+    if len(productos) > CANASTA_MAX_PRODUCTOS:
+        return [], 0, f"La canasta admite como máximo {CANASTA_MAX_PRODUCTOS} productos."
+
+    try:
+        limite = int(args.get("limite", CANASTA_LIMITE_POR_DEFECTO))
+    except ValueError:
+        return [], 0, "El parámetro limite debe ser un número entero."
+    if not 1 <= limite <= CANASTA_LIMITE_MAXIMO:
+        return [], 0, f"El parámetro limite debe estar entre 1 y {CANASTA_LIMITE_MAXIMO}."
+
+    return productos, limite, None
+
+
+TILE_EXTENT = 4096
+TILE_EXTENT_AGRUPADO = 256
+TILE_BUFFER = 64
+TILE_DETAIL_MIN_ZOOM = 13
+TILE_MAX_ZOOM = 22
+TILE_HTTP_MAX_AGE = 60
+GEOJSON_LIMITE_POR_DEFECTO = 1000
+GEOJSON_LIMITE_MAXIMO = 5000
+
+STORE_MAP_VERSION_QUERY = "SELECT version FROM store_map_version;"
+
+# Resumen del precio vigente por sucursal vinculada a un snapshot de Google.
+_STORE_PRICE_SUMMARY = """
+        LEFT JOIN sucursal_google AS sg ON sg.external_id = g.external_id
+        LEFT JOIN LATERAL (
+            SELECT
+                COUNT(*) AS total_productos,
+                MIN(pa.precio_lista) AS precio_minimo,
+                AVG(pa.precio_lista) AS precio_promedio,
+                MAX(pa.fecha_captura) AS ultima_captura
+            FROM precio_actual AS pa
+            WHERE pa.id_sucursal = sg.id_sucursal
+        ) AS r ON TRUE
+"""
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def store_tile_query(z: int, x: int, y: int) -> Tuple[str, Dict[str, object]]:
+    """Tesela MVT con las tiendas dentro de (z, x, y).
+
+    Desde `TILE_DETAIL_MIN_ZOOM` cada tienda es un punto con su resumen de
+    precios. En zooms menores se usa una grilla más gruesa y las tiendas que
+    caen en la misma celda se agrupan en un único punto con su conteo.
+    """
+    detalle = z >= TILE_DETAIL_MIN_ZOOM
+    extent = TILE_EXTENT if detalle else TILE_EXTENT_AGRUPADO
+    if detalle:
+        select_tiendas = f"""
+            SELECT
+                g.external_id,
+                g.display_name,
+                g.primary_type,
+                sg.id_sucursal,
+                r.total_productos,
+                r.precio_minimo::float8 AS precio_minimo,
+                r.precio_promedio::float8 AS precio_promedio,
+                r.ultima_captura::text AS ultima_captura,
+                ST_AsMVTGeom(ST_Transform(g.google_location, 3857), l.envelope, %(extent)s, %(buffer)s, TRUE) AS geom
+            FROM store_snapshots_google AS g
+            CROSS JOIN limites AS l
+            {_STORE_PRICE_SUMMARY}
+            WHERE g.google_location && l.envelope_4326
+        """
+    else:
+        select_tiendas = f"""
+            SELECT
+                COUNT(*) AS total_tiendas,
+                MIN(r.precio_minimo)::float8 AS precio_minimo,
+                celdas.geom
+            FROM (
+                SELECT
+                    g.external_id,
+                    ST_AsMVTGeom(ST_Transform(g.google_location, 3857), l.envelope, %(extent)s, %(buffer)s, TRUE) AS geom
+                FROM store_snapshots_google AS g
+                CROSS JOIN limites AS l
+                WHERE g.google_location && l.envelope_4326
+            ) AS celdas
+            JOIN store_snapshots_google AS g ON g.external_id = celdas.external_id
+            {_STORE_PRICE_SUMMARY}
+            GROUP BY celdas.geom
+        """
+
+    query = f"""
+        WITH limites AS (
+            SELECT
+                ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS envelope,
+                ST_Transform(ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => %(margin)s), 4326) AS envelope_4326
+        ),
+        tiendas AS (
+            {select_tiendas}
+        )
+        SELECT ST_AsMVT(tiendas, 'stores', %(extent)s, 'geom') AS mvt
+        FROM tiendas
+        WHERE geom IS NOT NULL;
+    """
+    params = {
+        "z": z,
+        "x": x,
+        "y": y,
+        "extent": extent,
+        "buffer": TILE_BUFFER,
+        "margin": TILE_BUFFER / extent,
+    }
+    return query, params
+
+
+def read_bbox_args(args: Any) -> Tuple[Optional[Tuple[float, float, float, float]], int, Optional[str]]:
+    """Valida `bbox=lon_min,lat_min,lon_max,lat_max` y `limite` para /api/tiendas."""
+    try:
+        lon_min, lat_min, lon_max, lat_max = (float(value) for value in args.get("bbox", "").split(","))
+    except ValueError:
+        return None, 0, "El parámetro bbox debe tener la forma lon_min,lat_min,lon_max,lat_max."
+    if not (-180 <= lon_min < lon_max <= 180 and -90 <= lat_min < lat_max <= 90):
+        return None, 0, "El parámetro bbox no es un rectángulo válido."
+
+    try:
+        limite = int(args.get("limite", GEOJSON_LIMITE_POR_DEFECTO))
+    except ValueError:
+        return None, 0, "El parámetro limite debe ser un número entero."
+    if not 1 <= limite <= GEOJSON_LIMITE_MAXIMO:
+        return None, 0, f"El parámetro limite debe estar entre 1 y {GEOJSON_LIMITE_MAXIMO}."
+
+    return (lon_min, lat_min, lon_max, lat_max), limite, None
+
+
+def stores_geojson_query(bbox: Tuple[float, float, float, float], limite: int) -> Tuple[str, List[object]]:
+    """FeatureCollection GeoJSON con las tiendas dentro del bbox, armada en la base."""
+    query = f"""
+        SELECT json_build_object(
+            'type', 'FeatureCollection',
+            'features', COALESCE(json_agg(tiendas.feature), '[]'::json)
+        ) AS geojson
+        FROM (
+            SELECT json_build_object(
+                'type', 'Feature',
+                'id', g.external_id,
+                'geometry', ST_AsGeoJSON(g.google_location)::json,
+                'properties', json_build_object(
+                    'display_name', g.display_name,
+                    'formatted_address', g.formatted_address,
+                    'primary_type', g.primary_type,
+                    'id_sucursal', sg.id_sucursal,
+                    'total_productos', r.total_productos,
+                    'precio_minimo', r.precio_minimo,
+                    'precio_promedio', r.precio_promedio,
+                    'ultima_captura', r.ultima_captura
+                )
+            ) AS feature
+            FROM store_snapshots_google AS g
+            {_STORE_PRICE_SUMMARY}
+            WHERE g.google_location && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+            ORDER BY g.external_id
+            LIMIT %s
+        ) AS tiendas;
+    """
+    return query, [*bbox, limite]
@@ -0,0 +1,106 @@
+-- Particionado mensual de precio por fecha_captura
+--
+-- Convierte `precio` en una tabla particionada por rango mensual sobre
+-- `fecha_captura`. La tabla original queda renombrada como
+-- `precio_sin_particionar` para poder verificar el copiado antes de borrarla.
+-- Es idempotente: si `precio` ya está particionada no vuelve a copiar datos.
+
+CREATE OR REPLACE FUNCTION precio_nombre_particion(mes DATE)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT 'precio_' || to_char(date_trunc('month', mes), 'YYYY"m"MM');
+$$;
+
+CREATE OR REPLACE FUNCTION precio_crear_particion(mes DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    desde DATE := date_trunc('month', mes)::DATE;
+    hasta DATE := (date_trunc('month', mes) + INTERVAL '1 month')::DATE;
+    nombre TEXT := precio_nombre_particion(mes);
+BEGIN
+    IF to_regclass(nombre) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF precio FOR VALUES FROM (%L) TO (%L)',
+            nombre, desde, hasta
+        );
+    END IF;
+    RETURN nombre;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION precio_desprender_particion(mes DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    nombre TEXT := precio_nombre_particion(mes);
+BEGIN
+    IF to_regclass(nombre) IS NULL THEN
+        RAISE EXCEPTION 'No existe la partición %', nombre;
+    END IF;
+    EXECUTE format('ALTER TABLE precio DETACH PARTITION %I', nombre);
+    RETURN nombre;
+END;
+$$;
+
+DO $$
+DECLARE
+    secuencia TEXT;
+    mes DATE;
+    ultimo_mes DATE;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'precio'::regclass
+    ) THEN
+        RAISE NOTICE 'precio ya está particionada, nada para migrar';
+        RETURN;
+    END IF;
+
+    ALTER TABLE precio RENAME TO precio_sin_particionar;
+
+    CREATE TABLE precio (
+        LIKE precio_sin_particionar INCLUDING DEFAULTS INCLUDING GENERATED,
+        PRIMARY KEY (id_precio, fecha_captura),
+        FOREIGN KEY (id_producto) REFERENCES producto(id_producto),
+        FOREIGN KEY (id_sucursal) REFERENCES sucursal(id_sucursal),
+        FOREIGN KEY (id_fuente) REFERENCES fuente_datos(id_fuente)
+    ) PARTITION BY RANGE (fecha_captura);
+
+    -- La secuencia de id_precio pasa a pertenecer a la tabla nueva para que
+    -- borrar precio_sin_particionar no la elimine.
+    secuencia := pg_get_serial_sequence('precio_sin_particionar', 'id_precio');
+    IF secuencia IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY precio.id_precio', secuencia);
+    END IF;
+
+    -- Se cubren todas las filas existentes (incluidas las fechadas a futuro)
+    -- y, como mínimo, los próximos 3 meses.
+    SELECT
+        COALESCE(date_trunc('month', MIN(fecha_captura))::DATE, date_trunc('month', CURRENT_DATE)::DATE),
+        GREATEST(
+            date_trunc('month', MAX(fecha_captura))::DATE,
+            (date_trunc('month', CURRENT_DATE) + INTERVAL '3 months')::DATE
+        )
+    INTO mes, ultimo_mes
+    FROM precio_sin_particionar;
+
+    WHILE mes <= ultimo_mes LOOP
+        PERFORM precio_crear_particion(mes);
+        mes := (mes + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    INSERT INTO precio SELECT * FROM precio_sin_particionar;
+END;
+$$;
+
+-- Los índices sobre la tabla padre se propagan a cada partición.
+-- BRIN es suficiente para recorrer rangos de fecha en datos que llegan en orden.
+CREATE INDEX IF NOT EXISTS idx_precio_fecha_captura_brin ON precio USING BRIN (fecha_captura);
+CREATE INDEX IF NOT EXISTS idx_precio_producto_fecha ON precio (id_producto, fecha_captura DESC);
+CREATE INDEX IF NOT EXISTS idx_precio_sucursal_fecha ON precio (id_sucursal, fecha_captura DESC);
+
+ANALYZE precio;
@@ -0,0 +1,149 @@
+-- Último precio por (producto, sucursal)
+--
+-- `precio_actual` guarda una fila por producto y sucursal con el precio más
+-- reciente (mayor fecha_captura y, a igual fecha, mayor id_precio). Se mantiene
+-- de forma incremental con triggers por sentencia sobre `precio`, de modo que
+-- una carga masiva (INSERT ... SELECT o COPY) actualiza la tabla en una sola
+-- operación. UPDATE y DELETE recalculan desde `precio` los pares afectados.
+-- Desprender particiones no dispara triggers: en ese caso se puede reconstruir
+-- con `SELECT precio_actual_reconstruir();`.
+
+BEGIN;
+
+-- Evita que se inserten precios entre la carga inicial y la creación de los triggers.
+LOCK TABLE precio IN SHARE ROW EXCLUSIVE MODE;
+
+-- Búsqueda de productos por nombre parcial (`ILIKE '%término%'`) en /api/canasta y en los filtros.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_producto_nombre_trgm ON producto USING GIN (nombre gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS precio_actual AS
+SELECT id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura
+FROM precio
+WITH NO DATA;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_precio_actual_producto_sucursal ON precio_actual (id_producto, id_sucursal);
+CREATE INDEX IF NOT EXISTS idx_precio_actual_producto_precio ON precio_actual (id_producto, precio_lista);
+CREATE INDEX IF NOT EXISTS idx_precio_actual_sucursal ON precio_actual (id_sucursal);
+
+CREATE OR REPLACE FUNCTION precio_actual_reconstruir()
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    filas BIGINT;
+BEGIN
+    TRUNCATE precio_actual;
+    INSERT INTO precio_actual (id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura)
+    SELECT DISTINCT ON (id_producto, id_sucursal)
+        id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura
+    FROM precio
+    ORDER BY id_producto, id_sucursal, fecha_captura DESC, id_precio DESC;
+    GET DIAGNOSTICS filas = ROW_COUNT;
+    ANALYZE precio_actual;
+    RETURN filas;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION precio_actual_sincronizar()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO precio_actual (id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura)
+    SELECT DISTINCT ON (id_producto, id_sucursal)
+        id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura
+    FROM nuevos
+    ORDER BY id_producto, id_sucursal, fecha_captura DESC, id_precio DESC
+    ON CONFLICT (id_producto, id_sucursal) DO UPDATE SET
+        id_precio = EXCLUDED.id_precio,
+        id_fuente = EXCLUDED.id_fuente,
+        precio_lista = EXCLUDED.precio_lista,
+        fecha_captura = EXCLUDED.fecha_captura
+    WHERE (EXCLUDED.fecha_captura, EXCLUDED.id_precio) > (precio_actual.fecha_captura, precio_actual.id_precio);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_precio_actual_insert ON precio;
+CREATE TRIGGER trg_precio_actual_insert
+    AFTER INSERT ON precio
+    REFERENCING NEW TABLE AS nuevos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION precio_actual_sincronizar();
+
+-- Un UPDATE puede mover la fila vigente hacia atrás en el tiempo o a otro
+-- (producto, sucursal); por eso se recalculan desde `precio` los pares
+-- anteriores y nuevos en lugar de reusar el upsert de las inserciones.
+CREATE OR REPLACE FUNCTION precio_actual_recalcular_pares(productos BIGINT[], sucursales BIGINT[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM precio_actual AS pa
+    USING unnest(productos, sucursales) AS a(id_producto, id_sucursal)
+    WHERE pa.id_producto = a.id_producto AND pa.id_sucursal = a.id_sucursal;
+
+    INSERT INTO precio_actual (id_producto, id_sucursal, id_precio, id_fuente, precio_lista, fecha_captura)
+    SELECT DISTINCT ON (p.id_producto, p.id_sucursal)
+        p.id_producto, p.id_sucursal, p.id_precio, p.id_fuente, p.precio_lista, p.fecha_captura
+    FROM precio AS p
+    JOIN unnest(productos, sucursales) AS a(id_producto, id_sucursal)
+        ON p.id_producto = a.id_producto AND p.id_sucursal = a.id_sucursal
+    ORDER BY p.id_producto, p.id_sucursal, p.fecha_captura DESC, p.id_precio DESC;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION precio_actual_sincronizar_update()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    productos BIGINT[];
+    sucursales BIGINT[];
+BEGIN
+    SELECT array_agg(id_producto), array_agg(id_sucursal)
+    INTO productos, sucursales
+    FROM (
+        SELECT id_producto, id_sucursal FROM viejos
+        UNION
+        SELECT id_producto, id_sucursal FROM nuevos
+    ) AS pares;
+    PERFORM precio_actual_recalcular_pares(productos, sucursales);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION precio_actual_sincronizar_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    productos BIGINT[];
+    sucursales BIGINT[];
+BEGIN
+    SELECT array_agg(id_producto), array_agg(id_sucursal)
+    INTO productos, sucursales
+    FROM (SELECT DISTINCT id_producto, id_sucursal FROM viejos) AS pares;
+    PERFORM precio_actual_recalcular_pares(productos, sucursales);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_precio_actual_update ON precio;
+CREATE TRIGGER trg_precio_actual_update
+    AFTER UPDATE ON precio
+    REFERENCING OLD TABLE AS viejos NEW TABLE AS nuevos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION precio_actual_sincronizar_update();
+
+DROP TRIGGER IF EXISTS trg_precio_actual_delete ON precio;
+CREATE TRIGGER trg_precio_actual_delete
+    AFTER DELETE ON precio
+    REFERENCING OLD TABLE AS viejos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION precio_actual_sincronizar_delete();
+
+SELECT precio_actual_reconstruir();
+
+COMMIT;
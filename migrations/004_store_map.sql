@@ -0,0 +1,147 @@
+-- Mapa de tiendas: vínculo sucursal/Google Places, índice espacial y versión para caché de teselas
+--
+-- Requiere 001 (store_snapshots_google) y 003 (precio_actual) en la misma base.
+-- ST_TileEnvelope con margen requiere PostGIS 3.1+.
+
+CREATE TABLE IF NOT EXISTS sucursal_google (
+    id_sucursal INTEGER PRIMARY KEY REFERENCES sucursal(id_sucursal) ON DELETE CASCADE,
+    external_id TEXT NOT NULL UNIQUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_store_snapshots_google_location
+    ON store_snapshots_google USING GIST (google_location);
+
+-- Vinculación automática por nombre: para cada sucursal sin vínculo se toma el
+-- snapshot cuyo display_name más se parece a "comercio sucursal", prefiriendo
+-- los que mencionan el barrio en la dirección. No pisa vínculos existentes, así
+-- que las correcciones manuales (src/sucursal_links.py import) se conservan.
+-- Devuelve la cantidad de vínculos creados.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_store_snapshots_google_display_name_trgm
+    ON store_snapshots_google USING GIN (display_name gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION sucursal_google_vincular(similitud_minima REAL DEFAULT 0.45)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    filas BIGINT;
+BEGIN
+    -- El operador % usa el índice trigram; su umbral vale hasta el fin de la transacción.
+    PERFORM set_config('pg_trgm.similarity_threshold', similitud_minima::TEXT, true);
+
+    INSERT INTO sucursal_google (id_sucursal, external_id)
+    SELECT s.id_sucursal, candidato.external_id
+    FROM sucursal AS s
+    JOIN comercio AS c ON c.id_comercio = s.id_comercio
+    JOIN barrio AS b ON b.id_barrio = s.id_barrio
+    CROSS JOIN LATERAL (
+        SELECT g.external_id
+        FROM store_snapshots_google AS g
+        WHERE g.display_name % (c.nombre_comercio || ' ' || s.nombre_sucursal)
+          AND NOT EXISTS (SELECT 1 FROM sucursal_google AS v WHERE v.external_id = g.external_id)
+        ORDER BY
+            g.formatted_address ILIKE '%' || b.nombre_barrio || '%' DESC,
+            similarity(g.display_name, c.nombre_comercio || ' ' || s.nombre_sucursal) DESC,
+            g.external_id
+        LIMIT 1
+    ) AS candidato
+    WHERE NOT EXISTS (SELECT 1 FROM sucursal_google AS v WHERE v.id_sucursal = s.id_sucursal)
+    ORDER BY s.id_sucursal
+    -- Si dos sucursales eligen el mismo lugar se queda la primera.
+    ON CONFLICT DO NOTHING;
+    GET DIAGNOSTICS filas = ROW_COUNT;
+    RETURN filas;
+END;
+$$;
+
+-- Una sola fila cuyo número aumenta cada vez que cambian los snapshots o los
+-- vínculos; las aplicaciones lo usan para invalidar las teselas en caché.
+CREATE TABLE IF NOT EXISTS store_map_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO store_map_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION store_map_version_bump()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE store_map_version SET version = version + 1, updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+-- En store_snapshots_google solo cuentan los cambios visibles en el mapa: el
+-- refresco periódico actualiza fetched_at (y el upsert reescribe todas las
+-- columnas aunque no cambien), y eso no debe vaciar las cachés ni hacer que
+-- los escritores se serialicen sobre la fila de versión. `UPDATE OF columnas`
+-- no alcanza porque el upsert nombra esas columnas en su SET, y las listas de
+-- columnas no admiten tablas de transición; por eso se compara OLD con NEW.
+CREATE OR REPLACE FUNCTION store_map_version_bump_snapshots()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM viejos
+            JOIN nuevos USING (external_id)
+            WHERE (viejos.display_name, viejos.formatted_address, viejos.primary_type, viejos.types, viejos.google_location)
+                IS DISTINCT FROM
+                (nuevos.display_name, nuevos.formatted_address, nuevos.primary_type, nuevos.types, nuevos.google_location)
+        ) THEN
+            RETURN NULL;
+        END IF;
+    ELSIF TG_OP = 'INSERT' THEN
+        -- Un upsert en el que todas las filas chocaron dispara igual el trigger de INSERT.
+        IF NOT EXISTS (SELECT 1 FROM nuevos) THEN
+            RETURN NULL;
+        END IF;
+    ELSIF TG_OP = 'DELETE' THEN
+        IF NOT EXISTS (SELECT 1 FROM viejos) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+    UPDATE store_map_version SET version = version + 1, updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_store_snapshots_google_map_version ON store_snapshots_google;
+DROP TRIGGER IF EXISTS trg_store_snapshots_google_map_version_insert ON store_snapshots_google;
+CREATE TRIGGER trg_store_snapshots_google_map_version_insert
+    AFTER INSERT ON store_snapshots_google
+    REFERENCING NEW TABLE AS nuevos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_map_version_bump_snapshots();
+
+DROP TRIGGER IF EXISTS trg_store_snapshots_google_map_version_update ON store_snapshots_google;
+CREATE TRIGGER trg_store_snapshots_google_map_version_update
+    AFTER UPDATE ON store_snapshots_google
+    REFERENCING OLD TABLE AS viejos NEW TABLE AS nuevos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_map_version_bump_snapshots();
+
+DROP TRIGGER IF EXISTS trg_store_snapshots_google_map_version_delete ON store_snapshots_google;
+CREATE TRIGGER trg_store_snapshots_google_map_version_delete
+    AFTER DELETE ON store_snapshots_google
+    REFERENCING OLD TABLE AS viejos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_map_version_bump_snapshots();
+
+DROP TRIGGER IF EXISTS trg_store_snapshots_google_map_version_truncate ON store_snapshots_google;
+CREATE TRIGGER trg_store_snapshots_google_map_version_truncate
+    AFTER TRUNCATE ON store_snapshots_google
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_map_version_bump();
+
+DROP TRIGGER IF EXISTS trg_sucursal_google_map_version ON sucursal_google;
+CREATE TRIGGER trg_sucursal_google_map_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON sucursal_google
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_map_version_bump();
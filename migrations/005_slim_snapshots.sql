@@ -0,0 +1,8 @@
+-- Snapshots livianos
+--
+-- Con `--slim` el barrido guarda solo las columnas tipadas y deja raw_json en NULL.
+-- Para los snapshots que sí guardan raw_json se usa compresión lz4 (PostgreSQL 14+),
+-- que aplica a los valores escritos a partir de ahora.
+
+ALTER TABLE store_snapshots_google ALTER COLUMN raw_json DROP NOT NULL;
+ALTER TABLE store_snapshots_google ALTER COLUMN raw_json SET COMPRESSION lz4;
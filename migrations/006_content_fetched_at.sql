@@ -0,0 +1,11 @@
+-- Antigüedad del contenido de los snapshots
+--
+-- `fetched_at` indica cuándo se verificó un lugar por última vez; con los niveles
+-- de field mask baratos el refresco solo la actualiza y no reescribe el contenido.
+-- `content_fetched_at` guarda cuándo se pidió el lugar completo, para que el
+-- refresco lo vuelva a pedir cuando el contenido supera la antigüedad máxima.
+
+ALTER TABLE store_snapshots_google ADD COLUMN IF NOT EXISTS content_fetched_at TIMESTAMPTZ;
+UPDATE store_snapshots_google SET content_fetched_at = fetched_at WHERE content_fetched_at IS NULL;
+ALTER TABLE store_snapshots_google ALTER COLUMN content_fetched_at SET DEFAULT NOW();
+ALTER TABLE store_snapshots_google ALTER COLUMN content_fetched_at SET NOT NULL;
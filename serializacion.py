@@ -0,0 +1,25 @@
+"""Proveedor JSON de Flask/Quart apoyado en src.json_codec."""
+
+from __future__ import annotations
+
+from typing import Any, Union
+
+from flask.json.provider import JSONProvider
+
+from src import json_codec
+
+
+class FastJSONProvider(JSONProvider):
+    """Serializa con orjson cuando está disponible y entrega los bytes sin recodificar."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return json_codec.dumps(obj).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return json_codec.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_codec.dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,373 @@
+"""Incremental Parquet archive of Google snapshots and price history.
+
+Writes date-partitioned, zstd-compressed Parquet files with flattened typed
+columns so analytics can run off Postgres. A manifest in the output directory
+keeps a watermark per dataset, so reruns only export rows added since the
+previous run. Because `store_snapshots_google` keeps only the latest version of
+each place, every run also captures the snapshots refreshed since the last one,
+building up the version history in the archive.
+
+Watermarks only advance up to a safety horizon that open transactions can no
+longer write behind, so rows committed after an export are picked up by the
+next run instead of being skipped. Files are written under `_staging/` and
+listed in the manifest before they are moved into the dataset tree, so a
+crashed run is completed on the next one rather than exported twice.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import psycopg
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import load_database_url, positive_int
+from .db import Database
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+STAGING_DIR = "_staging"
+MANIFEST_VERSION = 1
+COMPRESSION = "zstd"
+
+# fetched_at is the writer's transaction start, so a refresh that commits late
+# can insert rows dated before the previous export. Snapshots are exported only
+# up to this margin before now (and never past the oldest open transaction).
+SNAPSHOT_SAFETY_MARGIN = "5 minutes"
+
+# Flattened version of the Places fields requested through FIELD_MASK.
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("external_id", pa.string()),
+        ("display_name", pa.string()),
+        ("display_name_language", pa.string()),
+        ("formatted_address", pa.string()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("primary_type", pa.string()),
+        ("types", pa.list_(pa.string())),
+        ("fetched_at", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+PRECIO_SCHEMA = pa.schema(
+    [
+        ("id_precio", pa.int64()),
+        ("fecha_captura", pa.date32()),
+        ("precio_lista", pa.float64()),
+        ("id_producto", pa.int64()),
+        ("producto", pa.string()),
+        ("marca", pa.string()),
+        ("id_sucursal", pa.int64()),
+        ("nombre_sucursal", pa.string()),
+        ("nombre_barrio", pa.string()),
+        ("nombre_comercio", pa.string()),
+        ("nombre_fuente", pa.string()),
+    ]
+)
+
+
+@dataclass
+class Dataset:
+    name: str
+    schema: pa.Schema
+    query: str
+    partition_column: str
+    partition_of: Callable[[Dict[str, Any]], str]
+    initial_watermark: Dict[str, Any]
+    watermark_params: Callable[[Dict[str, Any]], Tuple[Any, ...]]
+    # Returns the watermark this run may advance to; may keep bookkeeping in the state.
+    horizon: Callable[[psycopg.Connection, Dict[str, Any]], Dict[str, Any]]
+
+
+def _snapshot_horizon(conn: psycopg.Connection, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Oldest fetched_at an open transaction could still write, minus a safety margin.
+
+    Other sessions' transaction starts are only visible to superusers and
+    pg_read_all_stats; otherwise the margin alone applies.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT GREATEST(
+                %s::timestamptz,
+                LEAST(
+                    now() - %s::interval,
+                    (
+                        SELECT min(xact_start)
+                        FROM pg_stat_activity
+                        WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()
+                    )
+                )
+            )
+            """,
+            (state["watermark"]["fetched_at"], SNAPSHOT_SAFETY_MARGIN),
+        )
+        horizon = cur.fetchone()[0]
+    # (horizon, "") sorts before every row stamped at `horizon`, which stay for the next run.
+    return {"fetched_at": horizon.isoformat(), "external_id": ""}
+
+
+def _precio_horizon(conn: psycopg.Connection, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Highest id_precio that no open transaction can still commit below.
+
+    Ids come from a sequence, so a slow writer can commit ids lower than rows
+    that are already visible. Every id handed out before a snapshot belongs to
+    a finished transaction once that snapshot's xmax is below the current
+    xmin. Each run records a checkpoint (sequence value, xmax) and exports up to
+    the previous checkpoint once its transactions are gone, or straight up to
+    the sequence value when no transaction is in progress.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_sequence_last_value(pg_get_serial_sequence('precio', 'id_precio')::regclass)")
+        last_id = cur.fetchone()[0] or 0
+        # New statement, new snapshot: every writer that drew an id up to last_id
+        # has finished or is listed as in progress here.
+        cur.execute(
+            """
+            SELECT pg_snapshot_xmin(s)::text, pg_snapshot_xmax(s)::text, NOT EXISTS (SELECT pg_snapshot_xip(s))
+            FROM pg_current_snapshot() AS s
+            """
+        )
+        xmin, xmax, idle = cur.fetchone()
+
+    bound = state["watermark"]["id_precio"]
+    checkpoint = state.pop("checkpoint", None)
+    if idle:
+        bound = max(bound, last_id)
+    else:
+        if checkpoint is not None and int(checkpoint["xmax"]) <= int(xmin):
+            bound = max(bound, checkpoint["id_precio"])
+        state["checkpoint"] = {"id_precio": last_id, "xmax": xmax}
+    return {"id_precio": bound}
+
+
+SNAPSHOTS = Dataset(
+    name="store_snapshots_google",
+    schema=SNAPSHOT_SCHEMA,
+    query="""
+        SELECT
+            external_id,
+            display_name,
+            raw_json->'displayName'->>'languageCode' AS display_name_language,
+            formatted_address,
+            ST_Y(google_location) AS latitude,
+            ST_X(google_location) AS longitude,
+            primary_type,
+            types,
+            fetched_at
+        FROM store_snapshots_google
+        WHERE (fetched_at, external_id) > (%s::timestamptz, %s)
+          AND (fetched_at, external_id) <= (%s::timestamptz, %s)
+        ORDER BY fetched_at, external_id
+    """,
+    partition_column="fetched_date",
+    partition_of=lambda row: row["fetched_at"].astimezone(timezone.utc).date().isoformat(),
+    initial_watermark={"fetched_at": "-infinity", "external_id": ""},
+    watermark_params=lambda mark: (mark["fetched_at"], mark["external_id"]),
+    horizon=_snapshot_horizon,
+)
+
+PRECIOS = Dataset(
+    name="precio",
+    schema=PRECIO_SCHEMA,
+    query="""
+        SELECT
+            p.id_precio,
+            p.fecha_captura::date AS fecha_captura,
+            p.precio_lista::float8 AS precio_lista,
+            p.id_producto,
+            pr.nombre AS producto,
+            pr.marca,
+            p.id_sucursal,
+            s.nombre_sucursal,
+            b.nombre_barrio,
+            c.nombre_comercio,
+            f.nombre_fuente
+        FROM precio AS p
+        JOIN producto AS pr ON p.id_producto = pr.id_producto
+        JOIN sucursal AS s ON p.id_sucursal = s.id_sucursal
+        JOIN barrio AS b ON s.id_barrio = b.id_barrio
+        JOIN comercio AS c ON s.id_comercio = c.id_comercio
+        JOIN fuente_datos AS f ON p.id_fuente = f.id_fuente
+        WHERE p.id_precio > %s AND p.id_precio <= %s
+        ORDER BY p.id_precio
+    """,
+    partition_column="mes",
+    partition_of=lambda row: row["fecha_captura"].strftime("%Y-%m"),
+    initial_watermark={"id_precio": 0},
+    watermark_params=lambda mark: (mark["id_precio"],),
+    horizon=_precio_horizon,
+)
+
+DATASETS = {"snapshots": SNAPSHOTS, "precio": PRECIOS}
+
+
+def load_manifest(out_dir: Path) -> Dict[str, Any]:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "datasets": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(out_dir: Path, manifest: Dict[str, Any]) -> None:
+    """Replace the manifest atomically so a crash never leaves it half written."""
+    path = out_dir / MANIFEST_NAME
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def export_dataset(
+    conn: psycopg.Connection,
+    dataset: Dataset,
+    out_dir: Path,
+    watermark: Dict[str, Any],
+    horizon: Dict[str, Any],
+    run_id: str,
+    batch_size: int,
+) -> List[Dict[str, Any]]:
+    """Stream rows between `watermark` and `horizon` into one staged Parquet file per partition.
+
+    Files are written under `_staging/<run_id>/`, outside the dataset tree, so
+    directory readers never see them half written. Returns the manifest entries
+    for the new files; `publish_pending` moves them into place.
+    """
+    writers: Dict[str, pq.ParquetWriter] = {}
+    rows_per_partition: Dict[str, int] = {}
+
+    try:
+        with conn.cursor(name=f"archive_{dataset.name}", row_factory=psycopg.rows.dict_row) as cur:
+            cur.itersize = batch_size
+            cur.execute(dataset.query, dataset.watermark_params(watermark) + dataset.watermark_params(horizon))
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                grouped: Dict[str, List[Dict[str, Any]]] = {}
+                for row in batch:
+                    grouped.setdefault(dataset.partition_of(row), []).append(row)
+                for partition, rows in grouped.items():
+                    writer = writers.get(partition)
+                    if writer is None:
+                        path = out_dir / _staging_path(_partition_path(dataset, partition, run_id), run_id)
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        writer = pq.ParquetWriter(path, dataset.schema, compression=COMPRESSION)
+                        writers[partition] = writer
+                    writer.write_table(pa.Table.from_pylist(rows, schema=dataset.schema))
+                    rows_per_partition[partition] = rows_per_partition.get(partition, 0) + len(rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return [
+        {"path": str(_partition_path(dataset, partition, run_id)), "rows": row_count, "run_id": run_id}
+        for partition, row_count in sorted(rows_per_partition.items())
+    ]
+
+
+def _partition_path(dataset: Dataset, partition: str, run_id: str) -> Path:
+    """Path of a partition file relative to the archive root."""
+    return Path(dataset.name) / f"{dataset.partition_column}={partition}" / f"part-{run_id}.parquet"
+
+
+def _staging_path(path: Path, run_id: str) -> Path:
+    return Path(STAGING_DIR) / run_id / path
+
+
+def publish_pending(out_dir: Path, manifest: Dict[str, Any]) -> None:
+    """Move every dataset's pending files into place and record them.
+
+    The pending entry is saved before any rename, so this also completes a run
+    that crashed halfway through publishing.
+    """
+    for name, state in manifest["datasets"].items():
+        pending = state.get("pending")
+        if pending is None:
+            continue
+        for item in pending["files"]:
+            staged = out_dir / _staging_path(Path(item["path"]), item["run_id"])
+            if staged.exists():
+                target = out_dir / item["path"]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged, target)
+            elif not (out_dir / item["path"]).exists():
+                raise FileNotFoundError(f"{name}: pending file {item['path']} is missing from staging and the archive")
+        state["files"].extend(pending["files"])
+        state["watermark"] = pending["watermark"]
+        del state["pending"]
+        save_manifest(out_dir, manifest)
+
+
+def archive(database_url: str, out_dir: Path, dataset_names: Iterable[str], batch_size: int) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    publish_pending(out_dir, manifest)
+    # Anything left in staging belongs to runs that crashed before recording their files.
+    shutil.rmtree(out_dir / STAGING_DIR, ignore_errors=True)
+
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+    db = Database(database_url)
+
+    with db.connect() as conn:
+        for name in dataset_names:
+            dataset = DATASETS[name]
+            state = manifest["datasets"].setdefault(
+                dataset.name, {"watermark": dataset.initial_watermark, "files": []}
+            )
+            horizon = dataset.horizon(conn, state)
+            files = export_dataset(conn, dataset, out_dir, state["watermark"], horizon, run_id, batch_size)
+            conn.commit()
+            state["pending"] = {"files": files, "watermark": horizon}
+            save_manifest(out_dir, manifest)
+            publish_pending(out_dir, manifest)
+            if not files:
+                logger.info("%s: nothing new up to %s", dataset.name, horizon)
+                continue
+            logger.info(
+                "%s: archived %s rows in %s files. watermark=%s",
+                dataset.name,
+                sum(item["rows"] for item in files),
+                len(files),
+                horizon,
+            )
+
+    shutil.rmtree(out_dir / STAGING_DIR, ignore_errors=True)
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Archive snapshots and prices as partitioned Parquet")
+    parser.add_argument("--out", type=Path, required=True, help="Archive root directory")
+    parser.add_argument(
+        "--datasets",
+        nargs="+",
+        choices=sorted(DATASETS),
+        default=sorted(DATASETS),
+        help="Datasets to export",
+    )
+    parser.add_argument("--batch-size", type=positive_int, default=50_000, help="Rows fetched per round trip")
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+    archive(load_database_url(), args.out, args.datasets, args.batch_size)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -12,16 +12,25 @@ import requests
 logger = logging.getLogger(__name__)
 
 PLACES_SEARCH_URL = "https://places.googleapis.com/v1/places:searchNearby"
-FIELD_MASK = ",".join(
-    [
-        "places.id",
-        "places.displayName",
-        "places.formattedAddress",
-        "places.location",
-        "places.primaryType",
-        "places.types",
-    ]
-)
+PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+# Named field-mask tiers, cheapest first. Smaller masks mean smaller responses
+# and cheaper SKUs; "full" is what the snapshots store.
+FIELD_MASK_TIERS: Dict[str, List[str]] = {
+    "ids": ["id"],
+    "location": ["id", "location"],
+    "full": ["id", "displayName", "formattedAddress", "location", "primaryType", "types"],
+}
+FULL_TIER = "full"
+
+
+def field_mask(tier: str, prefix: str = "places.") -> str:
+    if tier not in FIELD_MASK_TIERS:
+        raise ValueError(f"Unknown field mask tier {tier}")
+    return ",".join(f"{prefix}{field}" for field in FIELD_MASK_TIERS[tier])
+
+
+FIELD_MASK = field_mask(FULL_TIER)
 
 
 class GooglePlacesClient:
@@ -44,6 +53,7 @@ class GooglePlacesClient:
         radius_m: int,
         included_types: Iterable[str],
         max_results: int = 20,
+        field_mask_tier: str = FULL_TIER,
     ) -> List[Dict[str, Any]]:
         payload = {
             "includedTypes": list(included_types),
@@ -61,15 +71,25 @@ class GooglePlacesClient:
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": FIELD_MASK,
+            "X-Goog-FieldMask": field_mask(field_mask_tier),
+        }
+        data = self._request("POST", PLACES_SEARCH_URL, "search_nearby", headers=headers, json=payload)
+        return data.get("places", [])
+
+    def get_place(self, place_id: str, field_mask_tier: str = FULL_TIER) -> Dict[str, Any]:
+        """Fetch a single place through Place Details with the given field-mask tier."""
+        headers = {
+            "X-Goog-Api-Key": self.api_key,
+            "X-Goog-FieldMask": field_mask(field_mask_tier, prefix=""),
         }
+        return self._request("GET", PLACE_DETAILS_URL.format(place_id=place_id), "get_place", headers=headers)
 
+    def _request(self, method: str, url: str, operation: str, **kwargs: Any) -> Dict[str, Any]:
         attempt = 0
         while True:
-            response = self.session.post(PLACES_SEARCH_URL, headers=headers, json=payload, timeout=30)
+            response = self.session.request(method, url, timeout=30, **kwargs)
             if response.status_code == 200:
-                data = response.json()
-                return data.get("places", [])
+                return response.json()
 
             attempt += 1
             if response.status_code == 429 or 500 <= response.status_code < 600:
@@ -77,8 +97,9 @@ class GooglePlacesClient:
                     response.raise_for_status()
                 sleep_for = self._compute_backoff(attempt)
                 logger.warning(
-                    "Transient error %s on search_nearby. attempt=%s sleep=%.2fs",
+                    "Transient error %s on %s. attempt=%s sleep=%.2fs",
                     response.status_code,
+                    operation,
                     attempt,
                     sleep_for,
                 )
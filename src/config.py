@@ -1,6 +1,7 @@
 """Configuration helpers for the NEXO sweep utility."""
 from __future__ import annotations
 
+import argparse
 import os
 from dataclasses import dataclass
 from typing import Tuple
@@ -18,21 +19,36 @@ class SweepConfig:
     radius_m: int = 1500
     sleep_seconds: float = 0.1
     max_results: int = 20
+    field_mask_tier: str = "full"
+    slim_snapshots: bool = False
 
     @property
     def bounding_box(self) -> Tuple[float, float, float, float]:
         return self.lat_min, self.lat_max, self.lon_min, self.lon_max
 
 
+def load_database_url() -> str:
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL must be set")
+    return database_url
+
+
 def load_config() -> SweepConfig:
     google_api_key = os.environ.get("GOOGLE_PLACES_API_KEY")
-    database_url = os.environ.get("DATABASE_URL")
     if not google_api_key:
         raise RuntimeError("GOOGLE_PLACES_API_KEY must be set")
-    if not database_url:
-        raise RuntimeError("DATABASE_URL must be set")
+    database_url = load_database_url()
 
     return SweepConfig(
         google_api_key=google_api_key,
         database_url=database_url,
     )
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"Expected a positive integer, got {value}")
+    return number
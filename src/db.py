@@ -1,12 +1,14 @@
 """Database helpers for Google Places sweep."""
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import psycopg
+from psycopg.types.json import Jsonb
+
+from . import json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,14 @@ def _extract_location(place: Dict[str, Any]) -> Tuple[Optional[float], Optional[
     return lat, lon
 
 
-def upsert_snapshot(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
+def _raw_json(place: Dict[str, Any], slim: bool) -> Optional[Jsonb]:
+    """raw_json parameter; slim snapshots keep only the typed columns."""
+    if slim:
+        return None
+    return Jsonb(place, dumps=json_codec.dumps)
+
+
+def upsert_snapshot(conn: psycopg.Connection, place: Dict[str, Any], slim: bool = False) -> None:
     external_id = place.get("id")
     if not external_id:
         raise ValueError("Place missing id")
@@ -42,11 +51,13 @@ def upsert_snapshot(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
         cur.execute(
             """
             INSERT INTO store_snapshots_google (
-                external_id, display_name, formatted_address, primary_type, types, google_location, fetched_at, raw_json
+                external_id, display_name, formatted_address, primary_type, types, google_location,
+                fetched_at, content_fetched_at, raw_json
             ) VALUES (
                 %(external_id)s, %(display_name)s, %(formatted_address)s, %(primary_type)s, %(types)s,
                 CASE WHEN %(lon)s IS NOT NULL AND %(lat)s IS NOT NULL THEN ST_SetSRID(ST_Point(%(lon)s, %(lat)s), 4326) ELSE NULL END,
                 NOW(),
+                NOW(),
                 %(raw_json)s
             )
             ON CONFLICT (external_id) DO UPDATE SET
@@ -56,6 +67,7 @@ def upsert_snapshot(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
                 types = EXCLUDED.types,
                 google_location = EXCLUDED.google_location,
                 fetched_at = EXCLUDED.fetched_at,
+                content_fetched_at = EXCLUDED.content_fetched_at,
                 raw_json = EXCLUDED.raw_json
             """,
             {
@@ -66,11 +78,20 @@ def upsert_snapshot(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
                 "types": types,
                 "lon": lon,
                 "lat": lat,
-                "raw_json": json.dumps(place),
+                "raw_json": _raw_json(place, slim),
             },
         )
 
 
+def existing_snapshot_ids(conn: psycopg.Connection, external_ids: List[str]) -> Set[str]:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT external_id FROM store_snapshots_google WHERE external_id = ANY(%s)",
+            (external_ids,),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
 def ensure_store(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
     external_id = place.get("id")
     display_name = (place.get("displayName") or {}).get("text", "")
@@ -106,21 +127,46 @@ def ensure_store(conn: psycopg.Connection, place: Dict[str, Any]) -> None:
         )
 
 
-def get_expired_snapshots(conn: psycopg.Connection, ttl_days: int) -> List[Dict[str, Any]]:
+def iter_expired_snapshot_batches(
+    conn: psycopg.Connection,
+    ttl_days: int,
+    batch_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield expired snapshots, oldest first, in lists of at most `batch_size` rows.
+
+    Each batch is read with keyset pagination on (fetched_at, external_id) in
+    its own short transaction, so no snapshot or lock is held on `conn` between
+    batches. The cutoff is fixed when iteration starts, and rows refreshed in
+    the meantime move past it.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
     cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
-    with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
-        cur.execute(
-            """
-            SELECT external_id, ST_Y(google_location) AS latitude, ST_X(google_location) AS longitude
-            FROM store_snapshots_google
-            WHERE fetched_at < %s
-            """,
-            (cutoff,),
-        )
-        return list(cur.fetchall())
+    last_fetched_at: Any = "-infinity"
+    last_external_id = ""
+    while True:
+        with conn.cursor(row_factory=psycopg.rows.dict_row) as cur:
+            cur.execute(
+                """
+                SELECT external_id, fetched_at, content_fetched_at, ST_Y(google_location) AS latitude, ST_X(google_location) AS longitude
+                FROM store_snapshots_google
+                WHERE fetched_at < %s
+                  AND (fetched_at, external_id) > (%s::timestamptz, %s)
+                ORDER BY fetched_at, external_id
+                LIMIT %s
+                """,
+                (cutoff, last_fetched_at, last_external_id, batch_size),
+            )
+            batch = cur.fetchall()
+        conn.commit()
+        if not batch:
+            return
+        last_fetched_at = batch[-1]["fetched_at"]
+        last_external_id = batch[-1]["external_id"]
+        yield batch
 
 
-def update_snapshot(conn: psycopg.Connection, external_id: str, place: Dict[str, Any]) -> None:
+def update_snapshot(conn: psycopg.Connection, external_id: str, place: Dict[str, Any], slim: bool = False) -> None:
     lat, lon = _extract_location(place)
     with conn.cursor() as cur:
         cur.execute(
@@ -132,6 +178,7 @@ def update_snapshot(conn: psycopg.Connection, external_id: str, place: Dict[str,
                 types = %(types)s,
                 google_location = CASE WHEN %(lon)s IS NOT NULL AND %(lat)s IS NOT NULL THEN ST_SetSRID(ST_Point(%(lon)s, %(lat)s), 4326) ELSE NULL END,
                 fetched_at = NOW(),
+                content_fetched_at = NOW(),
                 raw_json = %(raw_json)s
             WHERE external_id = %(external_id)s
             """,
@@ -142,7 +189,16 @@ def update_snapshot(conn: psycopg.Connection, external_id: str, place: Dict[str,
                 "types": place.get("types") or [],
                 "lon": lon,
                 "lat": lat,
-                "raw_json": json.dumps(place),
+                "raw_json": _raw_json(place, slim),
                 "external_id": external_id,
             },
         )
+
+
+def touch_snapshot(conn: psycopg.Connection, external_id: str) -> None:
+    """Mark a snapshot as verified without rewriting its content (content_fetched_at is kept)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "UPDATE store_snapshots_google SET fetched_at = NOW() WHERE external_id = %s",
+            (external_id,),
+        )
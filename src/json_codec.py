@@ -0,0 +1,60 @@
+"""Pluggable JSON encoding with an orjson fast path.
+
+orjson is used when it is installed; set `NEXO_JSON_BACKEND=stdlib` to force
+the standard library. Both backends produce the same output: dates and
+datetimes as ISO 8601, `Decimal` as a string so no precision is lost.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Sequence, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None and os.environ.get("NEXO_JSON_BACKEND") != "stdlib" else "stdlib"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if BACKEND == "orjson":
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+else:
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+def to_columns(rows: Sequence[Mapping[str, Any]], columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """Turn a list of row dicts into one list per column, which encodes much smaller.
+
+    `columns` fixes the keys, so an empty result still tells clients its shape.
+    """
+    columns: Dict[str, List[Any]] = {key: [] for key in columns}
+    for row in rows:
+        for key, values in columns.items():
+            values.append(row[key])
+    return columns
@@ -5,11 +5,23 @@ import argparse
 import logging
 import sys
 import time
-from typing import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from .client_google_places import GooglePlacesClient
-from .config import SweepConfig, load_config
-from .db import Database, ensure_store, get_expired_snapshots, update_snapshot, upsert_snapshot
+import requests
+
+from .client_google_places import FIELD_MASK_TIERS, FULL_TIER, GooglePlacesClient
+from .config import SweepConfig, load_config, positive_int
+from .db import (
+    Database,
+    ensure_store,
+    existing_snapshot_ids,
+    iter_expired_snapshot_batches,
+    touch_snapshot,
+    update_snapshot,
+    upsert_snapshot,
+)
 from .grid import generate_grid
 
 logging.basicConfig(
@@ -20,9 +32,29 @@ logger = logging.getLogger(__name__)
 
 INCLUDED_TYPES = ["supermarket", "grocery_store"]
 
+# Coordinate change (degrees, ~10 m) above which a refresh fetches the full place again.
+LOCATION_TOLERANCE_DEG = 1e-4
+
+# Cheap tiers only detect moves, so a refresh also fetches the full place once
+# its content is older than this, even when nothing seems to have changed.
+MAX_CONTENT_AGE_DAYS = 90
+
+
+def _get_place(client: GooglePlacesClient, external_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch the full place, or None when the API rejects it (e.g. a removed place)."""
+    try:
+        return client.get_place(external_id)
+    except requests.HTTPError as exc:
+        logger.warning("Skipping %s, Place Details failed: %s", external_id, exc)
+        return None
+
 
 def sweep(config: SweepConfig) -> None:
-    """Run the grid sweep, persisting snapshots and store identifiers."""
+    """Run the grid sweep, persisting snapshots and store identifiers.
+
+    With a tier cheaper than "full" the search only discovers place ids, and
+    the full place is fetched just for ids that have no snapshot yet.
+    """
     client = GooglePlacesClient(config.google_api_key)
     db = Database(config.database_url)
 
@@ -35,46 +67,132 @@ def sweep(config: SweepConfig) -> None:
                 radius_m=config.radius_m,
                 included_types=INCLUDED_TYPES,
                 max_results=config.max_results,
+                field_mask_tier=config.field_mask_tier,
             )
+            if config.field_mask_tier != FULL_TIER:
+                known = existing_snapshot_ids(conn, [p["id"] for p in places if p.get("id")])
+                fetched = (_get_place(client, p["id"]) for p in places if p.get("id") and p["id"] not in known)
+                places = [place for place in fetched if place is not None]
             for place in places:
-                upsert_snapshot(conn, place)
+                upsert_snapshot(conn, place, slim=config.slim_snapshots)
                 ensure_store(conn, place)
             conn.commit()
             time.sleep(config.sleep_seconds)
 
 
-def refresh_expired(config: SweepConfig, ttl_days: int) -> None:
-    """Refresh snapshots that are older than the configured TTL."""
+def _location_changed(item: Dict[str, Any], place: Dict[str, Any]) -> bool:
+    location = place.get("location")
+    if not location:
+        # The tier did not include the location, so there is nothing to compare.
+        return False
+    return (
+        abs(location.get("latitude", 0.0) - item["latitude"]) > LOCATION_TOLERANCE_DEG
+        or abs(location.get("longitude", 0.0) - item["longitude"]) > LOCATION_TOLERANCE_DEG
+    )
+
+
+def _search_refreshed_places(
+    client: GooglePlacesClient,
+    config: SweepConfig,
+    batch: List[Dict[str, Any]],
+    content_cutoff: datetime,
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[str], int]:
+    """Query the API for every snapshot in the batch using the configured tier.
+
+    Returns the (external_id, full place) pairs to rewrite, the ids that were
+    confirmed unchanged and only need their fetched_at bumped, and how many
+    items were skipped. Places that moved or whose content predates
+    `content_cutoff` are fetched in full.
+    """
+    updates = []
+    unchanged = []
+    skipped = 0
+    for item in batch:
+        lat = item.get("latitude")
+        lon = item.get("longitude")
+        if lat is None or lon is None:
+            logger.warning("Skipping %s due to missing coordinates", item["external_id"])
+            skipped += 1
+            continue
+        places = client.search_nearby(
+            latitude=lat,
+            longitude=lon,
+            radius_m=config.radius_m,
+            included_types=INCLUDED_TYPES,
+            max_results=config.max_results,
+            field_mask_tier=config.field_mask_tier,
+        )
+        found = [p for p in places if p.get("id") == item["external_id"]]
+        if not found:
+            logger.warning("Place %s not returned on refresh", item["external_id"])
+            continue
+        if config.field_mask_tier == FULL_TIER:
+            updates.append((item["external_id"], found[0]))
+        elif _location_changed(item, found[0]) or item["content_fetched_at"] < content_cutoff:
+            place = _get_place(client, item["external_id"])
+            if place is None:
+                skipped += 1
+                continue
+            updates.append((item["external_id"], place))
+        else:
+            unchanged.append(item["external_id"])
+    return updates, unchanged, skipped
+
+
+def refresh_expired(
+    config: SweepConfig,
+    ttl_days: int,
+    batch_size: int = 100,
+    max_content_age_days: int = MAX_CONTENT_AGE_DAYS,
+) -> None:
+    """Refresh snapshots that are older than the configured TTL.
+
+    Expired snapshots are paged oldest first and each batch is committed on
+    its own, so memory use and the work lost on a crash are bounded by
+    `batch_size`. API calls for the next batch run in a worker thread while the
+    current batch is written. Places are checked with the configured tier and
+    only fetched in full when the tier shows they changed or their content is
+    older than `max_content_age_days`. With the "ids" tier nothing can look
+    changed, so refreshes only bump fetched_at until content reaches that age.
+    """
     client = GooglePlacesClient(config.google_api_key)
     db = Database(config.database_url)
     refreshed = 0
+    confirmed = 0
     skipped = 0
+    batches_done = 0
+    content_cutoff = datetime.now(timezone.utc) - timedelta(days=max_content_age_days)
 
-    with db.connect() as conn:
-        expired = get_expired_snapshots(conn, ttl_days)
-        logger.info("Found %s expired snapshots", len(expired))
-        for item in expired:
-            lat = item.get("latitude")
-            lon = item.get("longitude")
-            if lat is None or lon is None:
-                logger.warning("Skipping %s due to missing coordinates", item["external_id"])
-                skipped += 1
-                continue
-            places = client.search_nearby(
-                latitude=lat,
-                longitude=lon,
-                radius_m=config.radius_m,
-                included_types=INCLUDED_TYPES,
-                max_results=config.max_results,
+    with db.connect() as read_conn, db.connect() as write_conn, ThreadPoolExecutor(max_workers=1) as executor:
+        batches = iter_expired_snapshot_batches(read_conn, ttl_days, batch_size)
+
+        def submit_next() -> Optional[Future]:
+            batch = next(batches, None)
+            if batch is None:
+                return None
+            return executor.submit(_search_refreshed_places, client, config, batch, content_cutoff)
+
+        pending = submit_next()
+        while pending is not None:
+            updates, unchanged, batch_skipped = pending.result()
+            pending = submit_next()
+            for external_id, place in updates:
+                update_snapshot(write_conn, external_id, place, slim=config.slim_snapshots)
+            for external_id in unchanged:
+                touch_snapshot(write_conn, external_id)
+            write_conn.commit()
+            refreshed += len(updates)
+            confirmed += len(unchanged)
+            skipped += batch_skipped
+            batches_done += 1
+            logger.info(
+                "Committed batch %s. refreshed=%s confirmed=%s skipped=%s",
+                batches_done,
+                refreshed,
+                confirmed,
+                skipped,
             )
-            found = [p for p in places if p.get("id") == item["external_id"]]
-            if not found:
-                logger.warning("Place %s not returned on refresh", item["external_id"])
-                continue
-            update_snapshot(conn, item["external_id"], found[0])
-            refreshed += 1
-        conn.commit()
-    logger.info("Refresh completed. refreshed=%s skipped=%s", refreshed, skipped)
+    logger.info("Refresh completed. refreshed=%s confirmed=%s skipped=%s", refreshed, confirmed, skipped)
 
 
 def parse_args(argv: Iterable[str]) -> argparse.Namespace:
@@ -85,9 +203,30 @@ def parse_args(argv: Iterable[str]) -> argparse.Namespace:
     run_cmd.add_argument("--step-km", type=float, default=2.0, help="Grid step in kilometers")
     run_cmd.add_argument("--radius-m", type=int, default=1500, help="Search radius in meters")
     run_cmd.add_argument("--sleep", type=float, default=0.1, help="Sleep between API calls")
+    run_cmd.add_argument(
+        "--field-mask",
+        choices=sorted(FIELD_MASK_TIERS),
+        default=FULL_TIER,
+        help="Field-mask tier for the search; cheaper tiers fetch full details only for new places",
+    )
+    run_cmd.add_argument("--slim", action="store_true", help="Store typed columns only, without raw_json")
 
     refresh_cmd = subparsers.add_parser("refresh", help="Refresh expired snapshots")
     refresh_cmd.add_argument("--ttl-days", type=int, default=30, help="TTL in days for cached results")
+    refresh_cmd.add_argument("--batch-size", type=positive_int, default=100, help="Snapshots refreshed per committed batch")
+    refresh_cmd.add_argument(
+        "--field-mask",
+        choices=sorted(FIELD_MASK_TIERS),
+        default="location",
+        help="Field-mask tier used to check places; the full tier is fetched only on changes",
+    )
+    refresh_cmd.add_argument(
+        "--max-content-age-days",
+        type=positive_int,
+        default=MAX_CONTENT_AGE_DAYS,
+        help="Fetch the full place when its content is older than this, even if unchanged",
+    )
+    refresh_cmd.add_argument("--slim", action="store_true", help="Store typed columns only, without raw_json")
 
     return parser.parse_args(argv)
 
@@ -98,11 +237,18 @@ def main(argv: Iterable[str]) -> None:
     config.step_km = getattr(args, "step_km", config.step_km)
     config.radius_m = getattr(args, "radius_m", config.radius_m)
     config.sleep_seconds = getattr(args, "sleep", config.sleep_seconds)
+    config.field_mask_tier = args.field_mask
+    config.slim_snapshots = args.slim
 
     if args.command == "run":
         sweep(config)
     elif args.command == "refresh":
-        refresh_expired(config, ttl_days=args.ttl_days)
+        refresh_expired(
+            config,
+            ttl_days=args.ttl_days,
+            batch_size=args.batch_size,
+            max_content_age_days=args.max_content_age_days,
+        )
     else:
         raise ValueError(f"Unsupported command {args.command}")
 
@@ -0,0 +1,160 @@
+"""CLI to manage the monthly partitions of the `precio` table.
+
+Relies on the SQL helpers created by `migrations/002_partition_precio.sql`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import sys
+from datetime import date
+from typing import Iterable, List, Optional
+
+import psycopg
+
+from .config import load_database_url
+from .db import Database
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME_RE = re.compile(r"^precio_(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_month(value: str) -> date:
+    """Parse a YYYY-MM string into the first day of that month."""
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid month {value!r}, expected YYYY-MM") from exc
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Return the month encoded in a partition name such as `precio_2024m05`."""
+    match = PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partitions(conn: psycopg.Connection, start: date, months_ahead: int) -> List[str]:
+    """Create the partitions from `start` up to `months_ahead` months later (inclusive)."""
+    created = []
+    with conn.cursor() as cur:
+        for offset in range(months_ahead + 1):
+            cur.execute("SELECT precio_crear_particion(%s)", (add_months(start, offset),))
+            created.append(cur.fetchone()[0])
+    return created
+
+
+def list_partitions(conn: psycopg.Connection) -> List[str]:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class AS child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = 'precio'
+            ORDER BY child.relname
+            """
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def detach_partitions_before(conn: psycopg.Connection, before: date) -> List[str]:
+    """Detach every partition whose month is strictly older than `before`.
+
+    Detached partitions remain as standalone tables so they can be dumped and
+    dropped (or re-attached) without touching the live table.
+    """
+    detached = []
+    with conn.cursor() as cur:
+        for name in list_partitions(conn):
+            month = partition_month(name)
+            if month is None or month >= before:
+                continue
+            cur.execute("SELECT precio_desprender_particion(%s)", (month,))
+            detached.append(cur.fetchone()[0])
+    return detached
+
+
+def missing_future_partitions(conn: psycopg.Connection, months_ahead: int) -> List[date]:
+    """Months from the current one up to `months_ahead` later that have no partition yet.
+
+    There is no default partition, so inserting a price dated in one of these
+    months fails.
+    """
+    existing = {partition_month(name) for name in list_partitions(conn)}
+    current = date.today().replace(day=1)
+    return [
+        month
+        for month in (add_months(current, offset) for offset in range(months_ahead + 1))
+        if month not in existing
+    ]
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the precio table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_cmd = subparsers.add_parser("create", help="Create upcoming monthly partitions")
+    create_cmd.add_argument("--from", dest="start", type=parse_month, default=None, help="First month (YYYY-MM), defaults to current month")
+    create_cmd.add_argument("--months-ahead", type=int, default=3, help="Months to create after the first one")
+
+    detach_cmd = subparsers.add_parser("detach", help="Detach partitions older than a month")
+    detach_cmd.add_argument("--before", type=parse_month, required=True, help="Detach months strictly before YYYY-MM")
+
+    subparsers.add_parser("list", help="List current partitions")
+
+    check_cmd = subparsers.add_parser("check", help="Fail if upcoming months have no partition")
+    check_cmd.add_argument("--months-ahead", type=int, default=2, help="Months after the current one that must exist")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+    db = Database(load_database_url())
+
+    with db.connect() as conn:
+        if args.command == "create":
+            start = args.start or date.today().replace(day=1)
+            for name in create_partitions(conn, start, args.months_ahead):
+                logger.info("Partition ready: %s", name)
+            for month in missing_future_partitions(conn, args.months_ahead):
+                logger.warning("No partition for upcoming month %s", month.strftime("%Y-%m"))
+        elif args.command == "detach":
+            detached = detach_partitions_before(conn, args.before)
+            for name in detached:
+                logger.info("Partition detached: %s", name)
+            logger.info("Detached %s partitions", len(detached))
+        elif args.command == "list":
+            for name in list_partitions(conn):
+                print(name)
+        elif args.command == "check":
+            missing = missing_future_partitions(conn, args.months_ahead)
+            if missing:
+                logger.error(
+                    "Missing precio partitions for %s; run `create` before prices for those months arrive",
+                    ", ".join(month.strftime("%Y-%m") for month in missing),
+                )
+                sys.exit(1)
+            logger.info("Partitions exist through %s", add_months(date.today().replace(day=1), args.months_ahead).strftime("%Y-%m"))
+        else:
+            raise ValueError(f"Unsupported command {args.command}")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
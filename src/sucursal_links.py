@@ -0,0 +1,98 @@
+"""CLI to link `sucursal` rows with Google Places snapshots.
+
+The store map (`migrations/004_store_map.sql`) only shows price summaries for
+stores present in `sucursal_google`. `match` fills it by name similarity with
+`sucursal_google_vincular()`; `import` loads curated links from a CSV with
+`id_sucursal,external_id` columns and overrides existing ones.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import sys
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import psycopg
+
+from .config import load_database_url
+from .db import Database
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def match_links(conn: psycopg.Connection, min_similarity: float) -> int:
+    """Link unmatched sucursales to their most similar snapshot; returns links created."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT sucursal_google_vincular(%s)", (min_similarity,))
+        return cur.fetchone()[0]
+
+
+def read_links(path: Path) -> List[Tuple[int, str]]:
+    links = []
+    with path.open(newline="", encoding="utf-8") as handle:
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            try:
+                links.append((int(row["id_sucursal"]), row["external_id"].strip()))
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"{path}:{line}: expected id_sucursal,external_id") from exc
+    return links
+
+
+def import_links(conn: psycopg.Connection, links: Iterable[Tuple[int, str]]) -> int:
+    """Upsert the given links, replacing whatever each sucursal was linked to."""
+    links = list(links)
+    with conn.cursor() as cur:
+        # Frees the external ids being reassigned so the UNIQUE constraint holds.
+        cur.execute(
+            "DELETE FROM sucursal_google WHERE external_id = ANY(%s) OR id_sucursal = ANY(%s)",
+            ([external_id for _, external_id in links], [id_sucursal for id_sucursal, _ in links]),
+        )
+        cur.executemany(
+            "INSERT INTO sucursal_google (id_sucursal, external_id) VALUES (%s, %s)",
+            links,
+        )
+    return len(links)
+
+
+def parse_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Link sucursales with Google Places snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    match_cmd = subparsers.add_parser("match", help="Link unmatched sucursales by name similarity")
+    match_cmd.add_argument("--min-similarity", type=float, default=0.45, help="pg_trgm similarity threshold (0-1)")
+    match_cmd.add_argument("--dry-run", action="store_true", help="Report how many links would be created and roll back")
+
+    import_cmd = subparsers.add_parser("import", help="Load curated links from a CSV file")
+    import_cmd.add_argument("path", type=Path, help="CSV with id_sucursal,external_id columns")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Iterable[str]) -> None:
+    args = parse_args(argv)
+    db = Database(load_database_url())
+
+    with db.connect() as conn:
+        if args.command == "match":
+            created = match_links(conn, args.min_similarity)
+            if args.dry_run:
+                conn.rollback()
+                logger.info("Would link %s sucursales", created)
+                return
+            logger.info("Linked %s sucursales", created)
+        elif args.command == "import":
+            imported = import_links(conn, read_links(args.path))
+            logger.info("Imported %s links from %s", imported, args.path)
+        else:
+            raise ValueError(f"Unsupported command {args.command}")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""Caché en memoria de teselas vectoriales del mapa de tiendas."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+TileKey = Tuple[int, int, int]
+
+
+def tile_etag(data: bytes) -> str:
+    """ETag derivado del contenido, así cambia también cuando cambian los precios."""
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+class TileCache:
+    """LRU de teselas por (z, x, y) invalidado por la versión de `store_map_version`.
+
+    La versión se consulta como mucho cada `version_check_seconds`; cuando
+    cambia se descarta todo el contenido. `max_age_seconds` acota cuánto puede
+    quedar desactualizado el resumen de precios, que no cambia la versión.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 4096,
+        max_age_seconds: float = 300.0,
+        version_check_seconds: float = 5.0,
+    ) -> None:
+        self.max_items = max_items
+        self.max_age_seconds = max_age_seconds
+        self.version_check_seconds = version_check_seconds
+        self._tiles: "OrderedDict[TileKey, Tuple[float, bytes]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def needs_version_check(self) -> bool:
+        with self._lock:
+            if self._version is None:
+                return True
+            return time.monotonic() - self._version_checked_at >= self.version_check_seconds
+
+    def update_version(self, version: Optional[int]) -> None:
+        """Registra la versión leída de la base; si cambió descarta todas las teselas."""
+        with self._lock:
+            if version is None:
+                return
+            if version != self._version:
+                self._tiles.clear()
+                self._version = version
+            self._version_checked_at = time.monotonic()
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            entry = self._tiles.get(key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if time.monotonic() - stored_at > self.max_age_seconds:
+                del self._tiles[key]
+                return None
+            self._tiles.move_to_end(key)
+            return data
+
+    def put(self, key: TileKey, version: Optional[int], data: bytes) -> None:
+        """Guarda la tesela salvo que se haya generado con una versión ya vencida."""
+        with self._lock:
+            if version != self._version:
+                return
+            self._tiles[key] = (time.monotonic(), data)
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_items:
+                self._tiles.popitem(last=False)